@@ -1,432 +1,915 @@
-"""
-app.py - Servidor FastAPI para el asistente de navegación
-Recibe frames del frontend, procesa con YOLO y devuelve predicciones + instrucciones
-"""
-
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from vision_service import analyze_and_speak, initialize_clients as init_vision_clients
-import cv2
-import numpy as np
-import base64
-import io
-import os
-import logging
-from datetime import datetime
-from typing import Dict, List, Optional
-from object_detector import ObjectDetector
-from navigation_logic import NavigationLogic
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-# Inicializar FastAPI
-app = FastAPI(title="BlindPower API", version="1.0.0")
-
-# Configurar CORS - en producción, especificar dominios específicos
-CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST"],
-    allow_headers=["*"],
-)
-
-# Modelos Pydantic para validación
-class Base64ImageRequest(BaseModel):
-    image: str = Field(..., description="Imagen en formato base64")
-
-# Inicializar módulos globales
-object_detector = None
-navigation_logic = None
-
-@app.on_event("startup")
-async def startup_event():
-    """Inicializa el detector de objetos al arrancar el servidor"""
-    global object_detector, navigation_logic
-    
-    logger.info("🚀 Iniciando BlindPower API...")
-    
-    try:
-        # Inicializar detector de objetos
-        logger.info("📦 Cargando modelo YOLO...")
-        object_detector = ObjectDetector()
-        await object_detector.load_model()
-        
-        # Inicializar lógica de navegación
-        navigation_logic = NavigationLogic()
-        try:
-            init_vision_clients()
-            logger.info("✅ Servicios de visión inicializados")
-        except Exception as e:
-            logger.warning(f"⚠️ Servicios de visión no disponibles: {str(e)}")
-        
-        logger.info("✅ Servidor listo para recibir requests")
-    except Exception as e:
-        logger.error(f"❌ Error al inicializar: {str(e)}", exc_info=True)
-        raise
-
-@app.post("/analyze_image")
-async def analyze_image(
-    file: UploadFile = File(...),
-    question: Optional[str] = None
-):
-    """
-    Endpoint para analizar imagen con Claude y generar audio con ElevenLabs
-    
-    Args:
-        file: Imagen en formato JPEG/PNG (multipart/form-data)
-        question: Pregunta opcional sobre la imagen (query parameter)
-    
-    Returns:
-        JSON con:
-            - success: bool
-            - text: str (respuesta de Claude)
-            - audio_base64: str (audio MP3 en base64)
-            - audio_format: str ("mp3")
-            - error: str (si hay error)
-    """
-    try:
-        # Validar tipo de contenido
-        if file.content_type and file.content_type not in ["image/jpeg", "image/jpg", "image/png", "image/webp"]:
-            raise HTTPException(
-                status_code=400, 
-                detail="Tipo de archivo no soportado. Use JPEG, PNG o WebP."
-            )
-        
-        # Leer imagen
-        logger.info(f"📥 Analizando imagen: {file.filename}")
-        contents = await file.read()
-        
-        # Decodificar imagen
-        frame = _decode_image_from_bytes(contents)
-        height, width = frame.shape[:2]
-        logger.info(f"✅ Imagen decodificada: {width}x{height} píxeles")
-        
-        # Pregunta por defecto
-        pregunta = question or "¿qué es esto?"
-        logger.info(f"❓ Pregunta: {pregunta}")
-        
-        # Analizar y generar audio
-        result = analyze_and_speak(frame, pregunta)
-        
-        if not result.get("success"):
-            raise HTTPException(
-                status_code=500,
-                detail=result.get("error", "Error al procesar imagen")
-            )
-        
-        logger.info(f"✅ Análisis completado: {result['text']}")
-        
-        return JSONResponse(content=result)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error en análisis de imagen: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error al procesar imagen: {str(e)}")
-
-@app.get("/")
-async def root():
-    """Endpoint de salud"""
-    return {
-        "status": "ok",
-        "message": "BlindPower API está funcionando",
-        "endpoints": {
-            "/predict": "POST - Envía un frame para detección",
-            "/health": "GET - Estado del servidor"
-        }
-    }
-
-@app.get("/health")
-async def health():
-    """Endpoint de salud detallado"""
-    model_loaded = (
-        object_detector is not None 
-        and hasattr(object_detector, 'is_model_loaded') 
-        and object_detector.is_model_loaded
-    )
-    return {
-        "status": "healthy" if model_loaded else "degraded",
-        "model_loaded": model_loaded,
-        "navigation_logic_ready": navigation_logic is not None
-    }
-
-@app.post("/test")
-async def test_endpoint():
-    """Endpoint de prueba simple"""
-    return {
-        "message": "Endpoint funcionando correctamente",
-        "timestamp": str(datetime.now())
-    }
-
-def _decode_image_from_bytes(contents: bytes) -> np.ndarray:
-    """
-    Decodifica una imagen desde bytes a un array de numpy para OpenCV
-    
-    Args:
-        contents: Bytes de la imagen
-        
-    Returns:
-        Frame de OpenCV (BGR)
-        
-    Raises:
-        HTTPException: Si no se puede decodificar la imagen
-    """
-    if not contents or len(contents) == 0:
-        raise HTTPException(status_code=400, detail="Archivo vacío")
-    
-    # Validar tamaño máximo (10MB)
-    MAX_FILE_SIZE = 10 * 1024 * 1024
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Archivo demasiado grande. Máximo permitido: {MAX_FILE_SIZE / 1024 / 1024}MB"
-        )
-    
-    # Convertir a numpy array (OpenCV)
-    nparr = np.frombuffer(contents, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    if frame is None:
-        raise HTTPException(
-            status_code=400, 
-            detail="No se pudo decodificar la imagen. Verifica que sea JPEG o PNG válido."
-        )
-    
-    return frame
-
-def _process_predictions(frame: np.ndarray) -> Dict:
-    """
-    Procesa un frame y genera la respuesta completa con detecciones e instrucciones
-    
-    Args:
-        frame: Frame de OpenCV (BGR)
-        
-    Returns:
-        Dict con la respuesta completa
-    """
-    if not object_detector or not object_detector.is_model_loaded:
-        raise HTTPException(status_code=503, detail="Modelo no cargado aún")
-    
-    if navigation_logic is None:
-        raise HTTPException(status_code=503, detail="Lógica de navegación no inicializada")
-    
-    # Obtener dimensiones del frame
-    height, width = frame.shape[:2]
-    logger.debug(f"Procesando frame: {width}x{height} píxeles")
-    
-    # Realizar detección
-    predictions = object_detector.predict(frame)
-    logger.debug(f"Detecciones encontradas: {len(predictions)}")
-    
-    # FILTRAR: Solo incluir objetos dentro de zona segura (excepto autos y semáforos)
-    # Obtener zona segura primero (fija)
-    safe_zone = navigation_logic.get_safe_zone_coordinates()
-    
-    # Filtrar detecciones: solo objetos en zona segura, excepto autos y semáforos
-    filtered_predictions = []
-    for pred in predictions:
-        pred_type = pred.get('type', 'other')
-        class_name = pred.get('class', '').lower()
-        class_es = pred.get('class_es', '').lower()
-        
-        # Semáforos siempre se incluyen
-        if pred_type == 'traffic_light':
-            filtered_predictions.append(pred)
-        # Autos siempre se incluyen
-        elif class_name == 'car' or class_es == 'auto':
-            filtered_predictions.append(pred)
-        # Pasos de peatones siempre se incluyen (DESACTIVADO temporalmente)
-        # elif pred_type == 'crosswalk':
-        #     filtered_predictions.append(pred)
-        # Otros objetos solo si están en zona segura
-        elif navigation_logic._is_object_in_safe_zone(pred["bbox"]):
-            filtered_predictions.append(pred)
-    
-    # Generar instrucciones de navegación con detecciones filtradas
-    instruction = navigation_logic.process_detections(filtered_predictions, width, height)
-    
-    # Obtener obstáculos en zona segura
-    obstacles_in_safe_zone = navigation_logic._get_obstacles_in_safe_zone(
-        [p for p in filtered_predictions if p.get('type') == 'obstacle']
-    )
-    
-    # Calcular distancias para todas las detecciones filtradas
-    # EXCEPCIÓN: Semáforos siempre se muestran, sin importar la distancia
-    for pred in filtered_predictions:
-        if 'distance_meters' not in pred:
-            object_type = pred.get('class', 'unknown')
-            pred_type = pred.get('type', 'other')
-            
-            # Semáforos: no calcular distancia o usar distancia fija grande (siempre visibles)
-            if pred_type == 'traffic_light':
-                pred['distance_meters'] = 5.0  # Distancia fija para semáforos (siempre visibles)
-                pred['is_close'] = True  # Siempre se muestran
-            else:
-                distance_meters = navigation_logic._calculate_distance(pred["bbox"], object_type)
-                pred['distance_meters'] = distance_meters
-                pred['is_close'] = distance_meters < 2.0  # Menos de 2 metros = cercano
-    
-    # Preparar respuesta (usar predicciones filtradas)
-    response = {
-        "success": True,
-        "detections": [
-            {
-                "bbox": pred["bbox"],
-                "class": pred["class"],
-                "class_es": pred.get("class_es", pred["class"]),
-                "confidence": float(pred["confidence"]),
-                "type": pred["type"],
-                "distance_meters": float(pred.get("distance_meters", 10.0)),
-                "is_close": bool(pred.get("is_close", False)),  # True si < 2m
-                "in_safe_zone": navigation_logic._is_object_in_safe_zone(pred["bbox"]),
-                "direction": navigation_logic._get_direction_for_object_in_safe_zone(pred["bbox"]) if navigation_logic._is_object_in_safe_zone(pred["bbox"]) else None
-            }
-            for pred in filtered_predictions
-        ],
-        "instruction": {
-            "text": instruction["text"] if instruction else "Continúa con precaución",
-            "priority": instruction["priority"] if instruction else 0,
-            "type": instruction["type"] if instruction else "none",
-            "action": instruction.get("action", "none"),
-            "direction": instruction.get("direction", "none")
-        } if instruction else None,
-        "safe_zone": {
-            "bottom_left": safe_zone["bottom_left"],
-            "bottom_right": safe_zone["bottom_right"],
-            "top_left": safe_zone["top_left"],
-            "top_right": safe_zone["top_right"],
-            "center_x": safe_zone["center_x"],
-            "top_y": safe_zone["top_y"],
-            "bottom_y": safe_zone["bottom_y"],
-            "top_width": safe_zone["top_width"],
-            "bottom_width": safe_zone["bottom_width"],
-            "is_clear": len(obstacles_in_safe_zone) == 0,
-            "obstacle_count": len(obstacles_in_safe_zone)
-        },
-        "frame_info": {
-            "width": width,
-            "height": height
-        }
-    }
-    
-    return response
-
-@app.post("/predict")
-async def predict(file: UploadFile = File(...)):
-    """
-    Endpoint principal: recibe un frame y devuelve predicciones + instrucciones
-    
-    Args:
-        file: Imagen en formato JPEG/PNG (multipart/form-data)
-    
-    Returns:
-        JSON con detecciones, instrucciones y metadata
-    """
-    try:
-        # Validar tipo de contenido
-        if file.content_type and file.content_type not in ["image/jpeg", "image/jpg", "image/png", "image/webp"]:
-            logger.warning(f"Tipo de archivo no soportado: {file.content_type}")
-            raise HTTPException(
-                status_code=400, 
-                detail="Tipo de archivo no soportado. Use JPEG, PNG o WebP."
-            )
-        
-        # Leer imagen del request
-        logger.info(f"📥 Recibiendo archivo: {file.filename}, tipo: {file.content_type}")
-        contents = await file.read()
-        logger.debug(f"📦 Tamaño del archivo: {len(contents)} bytes")
-        
-        # Decodificar imagen
-        frame = _decode_image_from_bytes(contents)
-        height, width = frame.shape[:2]
-        logger.info(f"✅ Imagen decodificada: {width}x{height} píxeles")
-        
-        # Procesar predicciones
-        response = _process_predictions(frame)
-        
-        logger.info(
-            f"✅ Detecciones: {len(response['detections'])}, "
-            f"Instrucción: {response['instruction']['text'] if response['instruction'] else 'Ninguna'}"
-        )
-        
-        return JSONResponse(content=response)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error en predicción: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error al procesar frame: {str(e)}")
-
-@app.post("/predict_base64")
-async def predict_base64(data: Base64ImageRequest):
-    """
-    Endpoint alternativo: recibe frame en base64 (útil para testing)
-    
-    Args:
-        data: Base64ImageRequest con campo "image" conteniendo base64 string
-    
-    Returns:
-        JSON con detecciones e instrucciones
-    """
-    try:
-        image_data = data.image
-        
-        # Remover prefijo data:image si existe
-        if "," in image_data:
-            image_data = image_data.split(",")[1]
-        
-        # Validar que sea base64 válido
-        try:
-            img_bytes = base64.b64decode(image_data, validate=True)
-        except Exception as e:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Base64 inválido: {str(e)}"
-            )
-        
-        # Decodificar imagen usando función compartida
-        frame = _decode_image_from_bytes(img_bytes)
-        height, width = frame.shape[:2]
-        logger.info(f"✅ Imagen base64 decodificada: {width}x{height} píxeles")
-        
-        # Procesar predicciones (reutilizar lógica compartida)
-        response = _process_predictions(frame)
-        
-        # Simplificar respuesta para base64 (sin safe_zone completo)
-        simplified_response = {
-            "success": response["success"],
-            "detections": [
-                {
-                    "bbox": det["bbox"],
-                    "class": det["class"],
-                    "class_es": det["class_es"],
-                    "confidence": det["confidence"],
-                    "type": det["type"]
-                }
-                for det in response["detections"]
-            ],
-            "instruction": response["instruction"],
-            "frame_info": response["frame_info"]
-        }
-        
-        return JSONResponse(content=simplified_response)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error en predicción base64: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
-
+"""
+app.py - Servidor FastAPI para el asistente de navegación
+Recibe frames del frontend, procesa con YOLO y devuelve predicciones + instrucciones
+"""
+
+from fastapi import FastAPI, File, Request, UploadFile, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from vision_service import (
+    analyze_and_speak,
+    analyze_image_with_claude,
+    stream_audio_with_elevenlabs,
+    initialize_clients as init_vision_clients,
+)
+from urllib.parse import quote
+import orjson
+import asyncio
+import concurrent.futures
+import copy
+import cv2
+import hashlib
+import numpy as np
+import base64
+import io
+import os
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from object_detector import ObjectDetector
+from navigation_logic import NavigationLogic
+
+try:
+    # Decodificador base64 con kernels SIMD (SSSE3/AVX2/NEON)
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+    logging.warning("pybase64 no disponible. Instala con: pip install pybase64")
+
+try:
+    # Decode JPEG vía libjpeg-turbo (Huffman+IDCT con SSE2/AVX2, decode directo a BGR)
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError):
+    TURBOJPEG_AVAILABLE = False
+    logging.warning("PyTurboJPEG no disponible. Instala con: pip install PyTurboJPEG")
+
+try:
+    # Encoder JSON aún más rápido que orjson para payloads estructurados
+    import msgspec.json
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+    logging.warning("msgspec no disponible. Instala con: pip install msgspec")
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Inicializar FastAPI
+# ORJSONResponse serializa los payloads de detecciones ~3-5x más rápido
+# que json.dumps y maneja escalares de numpy nativamente
+app = FastAPI(title="BlindPower API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Configurar CORS - en producción, especificar dominios específicos
+CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["GET", "POST"],
+    allow_headers=["*"],
+)
+
+# Tipos de contenido aceptados para uploads de imágenes (frozenset: lookup
+# O(1) sin reconstruir una lista por request)
+_ALLOWED_CONTENT_TYPES = frozenset({"image/jpeg", "image/jpg", "image/png", "image/webp"})
+
+# Límite de tamaño de archivo (10MB)
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+# Lado mayor de la entrada del modelo YOLO (yolov8n usa 640)
+MODEL_INPUT_SIZE = 640
+
+# Objetos estimados más allá de esta distancia no aportan a la navegación
+# y se descartan antes del filtrado por zona (excepto semáforos)
+MAX_RELEVANT_DISTANCE = 10.0  # metros
+
+# Tamaño de chunk para lectura incremental de uploads (64KB)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _read_spooled(spooled) -> bytearray:
+    """
+    Lee el archivo spooled subyacente en chunks hacia un bytearray
+
+    Corre en un thread (ver _read_upload); el límite de tamaño se aplica
+    durante la lectura, no después de leer todo.
+
+    Args:
+        spooled: SpooledTemporaryFile subyacente del UploadFile
+
+    Returns:
+        bytearray con los bytes de la imagen
+
+    Raises:
+        HTTPException: Si el archivo excede MAX_FILE_SIZE
+    """
+    buffer = bytearray()
+    while True:
+        chunk = spooled.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Archivo demasiado grande. Máximo permitido: {MAX_FILE_SIZE / 1024 / 1024}MB"
+            )
+    return buffer
+
+async def _read_upload(file: UploadFile) -> bytearray:
+    """
+    Lee un UploadFile hacia un bytearray sin copias intermedias
+
+    Starlette ya dejó el contenido en el SpooledTemporaryFile subyacente
+    cuando el endpoint corre; leerlo directo en un thread evita un await
+    y un objeto bytes intermedio por chunk del wrapper UploadFile.read,
+    y evita materializar todo el archivo en un solo bytes.
+
+    Args:
+        file: Archivo subido (multipart/form-data)
+
+    Returns:
+        bytearray con los bytes de la imagen (np.frombuffer lo consume
+        después sin copiar)
+
+    Raises:
+        HTTPException: Si el archivo excede MAX_FILE_SIZE
+    """
+    return await asyncio.to_thread(_read_spooled, file.file)
+
+def _encode_response(payload: Dict):
+    """
+    Serializa un payload de predicción listo para devolver
+
+    Con msgspec instalado, codifica el dict directo a bytes (más rápido
+    que orjson sobre estos payloads) y lo envuelve en una Response ya
+    serializada; sin msgspec, devuelve el dict y ORJSONResponse se
+    encarga de la serialización.
+    """
+    if MSGSPEC_AVAILABLE:
+        return Response(content=msgspec.json.encode(payload), media_type="application/json")
+    return payload
+
+# Cache LRU de respuestas de predicción, keyed por hash del contenido crudo
+# Frames duplicados (comunes a ~10fps cuando el usuario está quieto) evitan
+# re-ejecutar todo el pipeline YOLO + navegación
+PREDICTION_CACHE_SIZE = 256
+PREDICTION_CACHE_TTL = 1.0  # segundos
+
+_prediction_cache: OrderedDict = OrderedDict()
+
+def _prediction_cache_key(contents, variant: str = "full") -> tuple:
+    """
+    Hash rápido de los bytes crudos del upload (antes de decodificar)
+
+    El variant distingue las formas de respuesta por endpoint (la
+    respuesta de /predict_base64 es más liviana que la de /predict).
+    """
+    return (variant, hashlib.blake2b(contents, digest_size=16).digest())
+
+def _prediction_cache_get(key: tuple) -> Optional[Dict]:
+    """Busca una respuesta cacheada; None si no existe o expiró el TTL"""
+    entry = _prediction_cache.get(key)
+    if entry is None:
+        return None
+
+    timestamp, response = entry
+    if time.time() - timestamp > PREDICTION_CACHE_TTL:
+        del _prediction_cache[key]
+        return None
+
+    # Marcar como usada recientemente (LRU)
+    _prediction_cache.move_to_end(key)
+    return copy.deepcopy(response)
+
+def _prediction_cache_put(key: tuple, response: Dict):
+    """Guarda una respuesta en el cache, desalojando las más antiguas"""
+    _prediction_cache[key] = (time.time(), copy.deepcopy(response))
+    _prediction_cache.move_to_end(key)
+    while len(_prediction_cache) > PREDICTION_CACHE_SIZE:
+        _prediction_cache.popitem(last=False)
+
+class BatchScheduler:
+    """
+    Agrupa frames de requests concurrentes en un solo forward pass de YOLO
+
+    Cada request encola su frame y espera un future; un task de fondo
+    junta hasta max_batch frames (o espera max_wait_ms) y llama a
+    ObjectDetector.predict_batch una sola vez, repartiendo los
+    resultados a cada coroutine que espera.
+    """
+
+    def __init__(self, detector, max_batch: int = 8, max_wait_ms: float = 15):
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # Un solo worker: serializa las llamadas al modelo (seguro para CUDA)
+        # mientras torch/OpenCV sueltan el GIL dentro de sus kernels en C,
+        # así el event loop sigue atendiendo requests durante la inferencia
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="yolo"
+        )
+
+    def start(self):
+        """Arranca el task de fondo que drena la cola"""
+        self._task = asyncio.get_event_loop().create_task(self._worker())
+
+    async def stop(self):
+        """Detiene el task de fondo"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Encola un frame y espera sus detecciones
+
+        Args:
+            frame: Frame de OpenCV (BGR)
+
+        Returns:
+            Lista de detecciones para ese frame
+        """
+        future = asyncio.get_event_loop().create_future()
+        await self.queue.put((frame, future))
+        return await future
+
+    async def _worker(self):
+        """Drena la cola, agrupa frames y ejecuta la inferencia batcheada"""
+        loop = asyncio.get_event_loop()
+        while True:
+            # Esperar al primer frame (bloqueante)
+            batch = [await self.queue.get()]
+
+            # Juntar más frames hasta max_batch o hasta agotar max_wait
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            frames = [frame for frame, _ in batch]
+            try:
+                # Inferencia fuera del event loop (no bloquea otros requests)
+                results = await loop.run_in_executor(
+                    self._executor, self.detector.predict_batch, frames
+                )
+                for (_, future), detections in zip(batch, results):
+                    if not future.done():
+                        future.set_result(detections)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+# Inicializar módulos globales
+object_detector = None
+navigation_logic = None
+batch_scheduler = None
+
+@app.on_event("startup")
+async def startup_event():
+    """Inicializa el detector de objetos al arrancar el servidor"""
+    global object_detector, navigation_logic, batch_scheduler
+
+    logger.info("🚀 Iniciando BlindPower API...")
+
+    try:
+        # Inicializar detector de objetos
+        logger.info("📦 Cargando modelo YOLO...")
+        object_detector = ObjectDetector()
+        await object_detector.load_model()
+
+        # Inicializar scheduler de batching (agrupa frames concurrentes)
+        batch_scheduler = BatchScheduler(object_detector)
+        batch_scheduler.start()
+
+        # Inicializar lógica de navegación
+        navigation_logic = NavigationLogic()
+        try:
+            init_vision_clients()
+            logger.info("✅ Servicios de visión inicializados")
+        except Exception as e:
+            logger.warning(f"⚠️ Servicios de visión no disponibles: {str(e)}")
+        
+        logger.info("✅ Servidor listo para recibir requests")
+    except Exception as e:
+        logger.error(f"❌ Error al inicializar: {str(e)}", exc_info=True)
+        raise
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Detiene el scheduler de batching al apagar el servidor"""
+    if batch_scheduler is not None:
+        await batch_scheduler.stop()
+
+@app.post("/analyze_image")
+async def analyze_image(
+    file: UploadFile = File(...),
+    question: Optional[str] = None
+):
+    """
+    Endpoint para analizar imagen con Claude y generar audio con ElevenLabs
+    
+    Args:
+        file: Imagen en formato JPEG/PNG (multipart/form-data)
+        question: Pregunta opcional sobre la imagen (query parameter)
+    
+    Returns:
+        JSON con:
+            - success: bool
+            - text: str (respuesta de Claude)
+            - audio_base64: str (audio MP3 en base64)
+            - audio_format: str ("mp3")
+            - error: str (si hay error)
+    """
+    try:
+        # Validar tipo de contenido
+        content_type = file.content_type
+        if content_type and content_type not in _ALLOWED_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail="Tipo de archivo no soportado. Use JPEG, PNG o WebP."
+            )
+
+        # Leer imagen en streaming (sin materializar bytes completos)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"📥 Analizando imagen: {file.filename}")
+        contents = await _read_upload(file)
+        
+        # Decodificar imagen
+        frame = _decode_image_from_bytes(contents)
+        height, width = frame.shape[:2]
+        logger.info(f"✅ Imagen decodificada: {width}x{height} píxeles")
+        
+        # Pregunta por defecto
+        pregunta = question or "¿qué es esto?"
+        logger.info(f"❓ Pregunta: {pregunta}")
+        
+        # Analizar y generar audio
+        result = analyze_and_speak(frame, pregunta)
+        
+        if not result.get("success"):
+            raise HTTPException(
+                status_code=500,
+                detail=result.get("error", "Error al procesar imagen")
+            )
+        
+        logger.info(f"✅ Análisis completado: {result['text']}")
+
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error en análisis de imagen: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error al procesar imagen: {str(e)}")
+
+@app.post("/analyze_image_stream")
+async def analyze_image_stream(
+    file: UploadFile = File(...),
+    question: Optional[str] = None
+):
+    """
+    Variante streaming de /analyze_image: responde audio/mpeg por chunks
+    a medida que ElevenLabs los sintetiza, así el primer audio llega al
+    cliente con el primer chunk en vez de al final de la síntesis (y sin
+    el +33% de tamaño del base64). El texto de Claude viaja en el header
+    X-Response-Text (URL-encoded).
+    """
+    try:
+        content_type = file.content_type
+        if content_type and content_type not in _ALLOWED_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail="Tipo de archivo no soportado. Use JPEG, PNG o WebP."
+            )
+
+        contents = await _read_upload(file)
+        frame = _decode_image_from_bytes(contents)
+        pregunta = question or "¿qué es esto?"
+
+        # Claude en un thread para no bloquear el event loop
+        text_response = await asyncio.to_thread(
+            analyze_image_with_claude, frame, pregunta
+        )
+        if not text_response:
+            raise HTTPException(
+                status_code=500,
+                detail="No se pudo analizar la imagen con Claude"
+            )
+
+        return StreamingResponse(
+            stream_audio_with_elevenlabs(text_response),
+            media_type="audio/mpeg",
+            headers={"X-Response-Text": quote(text_response)}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error en análisis streaming: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error al procesar imagen: {str(e)}")
+
+@app.get("/")
+async def root():
+    """Endpoint de salud"""
+    return {
+        "status": "ok",
+        "message": "BlindPower API está funcionando",
+        "endpoints": {
+            "/predict": "POST - Envía un frame para detección",
+            "/health": "GET - Estado del servidor"
+        }
+    }
+
+@app.get("/health")
+async def health():
+    """Endpoint de salud detallado"""
+    model_loaded = (
+        object_detector is not None 
+        and hasattr(object_detector, 'is_model_loaded') 
+        and object_detector.is_model_loaded
+    )
+    return {
+        "status": "healthy" if model_loaded else "degraded",
+        "model_loaded": model_loaded,
+        "navigation_logic_ready": navigation_logic is not None
+    }
+
+@app.post("/test")
+async def test_endpoint():
+    """Endpoint de prueba simple"""
+    return {
+        "message": "Endpoint funcionando correctamente",
+        "timestamp": str(datetime.now())
+    }
+
+# Decoder TurboJPEG compartido, inicializado lazy (abre la librería nativa)
+_turbojpeg_decoder = None
+
+def _get_turbojpeg():
+    """Devuelve el decoder TurboJPEG del módulo, creándolo la primera vez"""
+    global _turbojpeg_decoder
+    if _turbojpeg_decoder is None:
+        _turbojpeg_decoder = TurboJPEG()
+    return _turbojpeg_decoder
+
+def _peek_jpeg_dimensions(contents) -> Optional[tuple]:
+    """
+    Lee ancho/alto de un JPEG desde su marker SOF sin decodificarlo
+
+    Args:
+        contents: Bytes de la imagen
+
+    Returns:
+        Tupla (width, height) o None si no es JPEG o no se encuentra el SOF
+    """
+    if len(contents) < 4 or contents[0:2] != b'\xff\xd8':
+        return None
+
+    i = 2
+    while i + 9 < len(contents):
+        if contents[i] != 0xFF:
+            i += 1
+            continue
+
+        marker = contents[i + 1]
+        # Bytes de relleno 0xFF
+        if marker == 0xFF:
+            i += 1
+            continue
+        # Markers sin payload (SOI, TEM, RSTn)
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        # EOI o inicio del scan comprimido: no hay SOF utilizable después
+        if marker in (0xD9, 0xDA):
+            break
+
+        length = (contents[i + 2] << 8) | contents[i + 3]
+        # SOF0-SOF15 excepto DHT/JPG/DAC llevan las dimensiones del frame
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = (contents[i + 5] << 8) | contents[i + 6]
+            width = (contents[i + 7] << 8) | contents[i + 8]
+            return (width, height)
+
+        i += 2 + length
+
+    return None
+
+def _decode_image_from_bytes(contents) -> np.ndarray:
+    """
+    Decodifica una imagen desde bytes a un array de numpy para OpenCV
+
+    Args:
+        contents: Bytes de la imagen (bytes o bytearray)
+
+    Returns:
+        Frame de OpenCV (BGR)
+
+    Raises:
+        HTTPException: Si no se puede decodificar la imagen
+    """
+    if not contents or len(contents) == 0:
+        raise HTTPException(status_code=400, detail="Archivo vacío")
+
+    # Validar tamaño máximo (10MB)
+    if len(contents) > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Archivo demasiado grande. Máximo permitido: {MAX_FILE_SIZE / 1024 / 1024}MB"
+        )
+    
+    # JPEGs mucho más grandes que la entrada del modelo se decodifican a
+    # escala reducida: libjpeg hace el IDCT a 1/2 o 1/4 casi gratis y YOLO
+    # iba a reescalar a MODEL_INPUT_SIZE de todas formas. La geometría de
+    # navegación usa solo ratios del frame, así que no se ve afectada.
+    reduction = 1
+    dimensions = _peek_jpeg_dimensions(contents)
+    if dimensions is not None:
+        longest_edge = max(dimensions)
+        if longest_edge >= 4 * MODEL_INPUT_SIZE:
+            reduction = 4
+        elif longest_edge >= 2 * MODEL_INPUT_SIZE:
+            reduction = 2
+
+    frame = None
+    is_jpeg = len(contents) >= 3 and contents[:3] == b'\xff\xd8\xff'
+
+    # Fast path JPEG: libjpeg-turbo decodifica directo a BGR con SIMD
+    if is_jpeg and TURBOJPEG_AVAILABLE:
+        try:
+            frame = _get_turbojpeg().decode(
+                contents,
+                pixel_format=TJPF_BGR,
+                scaling_factor=(1, reduction)
+            )
+        except Exception as e:
+            logger.debug(f"TurboJPEG falló, cayendo a cv2.imdecode: {str(e)}")
+            frame = None
+
+    # PNG/WebP (o fallback si turbojpeg no está/falló): OpenCV
+    if frame is None:
+        nparr = np.frombuffer(contents, np.uint8)
+        imread_flag = cv2.IMREAD_COLOR
+        if reduction == 2:
+            imread_flag = cv2.IMREAD_REDUCED_COLOR_2
+        elif reduction == 4:
+            imread_flag = cv2.IMREAD_REDUCED_COLOR_4
+        frame = cv2.imdecode(nparr, imread_flag)
+    
+    if frame is None:
+        raise HTTPException(
+            status_code=400, 
+            detail="No se pudo decodificar la imagen. Verifica que sea JPEG o PNG válido."
+        )
+    
+    return frame
+
+def _resize_for_model(frame: np.ndarray):
+    """
+    Reduce el frame al tamaño de entrada del modelo una sola vez
+
+    YOLO iba a reescalar internamente de todas formas; hacerlo aquí
+    reduce el buffer BGR que viaja por el resto del pipeline (hasta ~9x
+    menos tráfico de memoria para capturas 1080p). Los bboxes se
+    reescalan de vuelta con el scale retornado para que las coordenadas
+    visibles al cliente queden en píxeles del frame original.
+
+    Args:
+        frame: Frame decodificado (BGR)
+
+    Returns:
+        Tupla (frame reducido, scale aplicado); scale=1.0 si no se redujo
+    """
+    height, width = frame.shape[:2]
+    longest_edge = max(width, height)
+    if longest_edge <= MODEL_INPUT_SIZE:
+        return frame, 1.0
+
+    scale = MODEL_INPUT_SIZE / longest_edge
+    new_size = (round(width * scale), round(height * scale))
+    return cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA), scale
+
+async def _process_predictions(
+    frame: np.ndarray,
+    *,
+    include_safe_zone: bool = True,
+    include_per_det_zone: bool = True
+) -> Dict:
+    """
+    Procesa un frame y genera la respuesta completa con detecciones e instrucciones
+
+    Args:
+        frame: Frame de OpenCV (BGR)
+        include_safe_zone: Incluir el bloque safe_zone en la respuesta
+        include_per_det_zone: Incluir in_safe_zone/direction por detección
+
+    Returns:
+        Dict con la respuesta completa
+    """
+    if not object_detector or not object_detector.is_model_loaded:
+        raise HTTPException(status_code=503, detail="Modelo no cargado aún")
+
+    if navigation_logic is None:
+        raise HTTPException(status_code=503, detail="Lógica de navegación no inicializada")
+
+    # Obtener dimensiones del frame
+    height, width = frame.shape[:2]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Procesando frame: {width}x{height} píxeles")
+
+    # Realizar detección sobre el frame reducido al tamaño del modelo
+    # (batcheada con otros requests concurrentes)
+    frame_small, scale = _resize_for_model(frame)
+    predictions = await batch_scheduler.submit(frame_small)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Detecciones encontradas: {len(predictions)}")
+
+    # Reescalar bboxes a píxeles del frame original antes de cualquier
+    # geometría, para que zona segura y distancias usen las dims originales
+    if scale != 1.0:
+        inv_scale = 1.0 / scale
+        for pred in predictions:
+            pred["bbox"] = [coord * inv_scale for coord in pred["bbox"]]
+    
+    # Calcular distancias UNA vez, antes de cualquier filtro, y descartar
+    # objetos más allá de MAX_RELEVANT_DISTANCE para que la lógica de
+    # navegación no razone sobre detecciones irrelevantes. Semáforos usan
+    # distancia fija y siempre pasan.
+    navigation_logic.frame_width = width
+    navigation_logic.frame_height = height
+    calc_distance = navigation_logic._calculate_distance
+    relevant_predictions = []
+    for pred in predictions:
+        if pred.get('type', 'other') == 'traffic_light':
+            pred['distance_meters'] = 5.0  # Distancia fija para semáforos (siempre visibles)
+            pred['is_close'] = True  # Siempre se muestran
+            relevant_predictions.append(pred)
+        else:
+            distance_meters = calc_distance(pred["bbox"], pred.get('class', 'unknown'))
+            pred['distance_meters'] = distance_meters
+            pred['is_close'] = distance_meters < 2.0  # Menos de 2 metros = cercano
+            if distance_meters <= MAX_RELEVANT_DISTANCE:
+                relevant_predictions.append(pred)
+    predictions = relevant_predictions
+
+    # FILTRAR: Solo incluir objetos dentro de zona segura (excepto autos y semáforos)
+    # Obtener zona segura primero (fija)
+    safe_zone = navigation_logic.get_safe_zone_coordinates()
+
+    # Filtrar detecciones: solo objetos en zona segura, excepto autos y semáforos
+    # Layout SoA: arrays paralelos de bboxes/tipos/clases construidos una vez,
+    # con la membresía al trapecio vectorizada en numpy en lugar de un loop
+    # de Python con lookups de dict por detección. La membresía se anota en
+    # el dict y la respuesta la reutiliza.
+    filtered_predictions = []
+    if predictions:
+        bboxes = np.asarray([p["bbox"] for p in predictions], dtype=np.float32)
+        types = np.array([p.get('type', 'other') for p in predictions])
+        classes_lower = np.array([p.get('class', '').lower() for p in predictions])
+        classes_es_lower = np.array([p.get('class_es', '').lower() for p in predictions])
+
+        in_zone_mask = navigation_logic.objects_in_safe_zone_mask(bboxes)
+
+        # Semáforos y autos siempre se incluyen; otros solo en zona segura
+        # (pasos de peatones DESACTIVADOS temporalmente)
+        keep_mask = (
+            (types == 'traffic_light')
+            | (classes_lower == 'car')
+            | (classes_es_lower == 'auto')
+            | in_zone_mask
+        )
+
+        for idx in np.nonzero(keep_mask)[0]:
+            pred = predictions[idx]
+            pred['in_safe_zone'] = bool(in_zone_mask[idx])
+            filtered_predictions.append(pred)
+    
+    # Generar instrucciones de navegación con detecciones filtradas
+    instruction = navigation_logic.process_detections(filtered_predictions, width, height)
+
+    # Obtener obstáculos en zona segura (solo necesario para el bloque safe_zone)
+    obstacles_in_safe_zone = []
+    if include_safe_zone:
+        obstacles_in_safe_zone = navigation_logic._get_obstacles_in_safe_zone(
+            [p for p in filtered_predictions if p.get('type') == 'obstacle']
+        )
+    
+    # Armar detecciones con bindings locales: evitar un LOAD_METHOD y
+    # lookups de dict repetidos por iteración dentro del loop caliente
+    get_direction = navigation_logic._get_direction_for_object_in_safe_zone
+    detections = []
+    for pred in filtered_predictions:
+        bbox = pred["bbox"]
+        class_name = pred["class"]
+        # Sin casts float()/bool() por campo: los valores ya son escalares
+        # de Python y orjson serializa escalares de numpy nativamente
+        detection = {
+            "bbox": bbox,
+            "class": class_name,
+            "class_es": pred.get("class_es", class_name),
+            "confidence": pred["confidence"],
+            "type": pred["type"],
+            "distance_meters": pred.get("distance_meters", 10.0),
+            "is_close": pred.get("is_close", False),  # True si < 2m
+        }
+        if include_per_det_zone:
+            in_sz = pred["in_safe_zone"]
+            detection["in_safe_zone"] = in_sz
+            detection["direction"] = get_direction(bbox) if in_sz else None
+        detections.append(detection)
+
+    # Preparar respuesta (usar predicciones filtradas)
+    response = {
+        "success": True,
+        "detections": detections,
+        "instruction": {
+            "text": instruction["text"] if instruction else "Continúa con precaución",
+            "priority": instruction["priority"] if instruction else 0,
+            "type": instruction["type"] if instruction else "none",
+            "action": instruction.get("action", "none"),
+            "direction": instruction.get("direction", "none")
+        } if instruction else None,
+        "frame_info": {
+            "width": width,
+            "height": height
+        }
+    }
+
+    if include_safe_zone:
+        # Dict-merge sobre las coordenadas ya calculadas en vez de copiar
+        # las claves una por una a mano (una sola alocación de dict)
+        response["safe_zone"] = {
+            **safe_zone,
+            "is_clear": len(obstacles_in_safe_zone) == 0,
+            "obstacle_count": len(obstacles_in_safe_zone)
+        }
+
+    return response
+
+@app.post("/predict")
+async def predict(file: UploadFile = File(...)):
+    """
+    Endpoint principal: recibe un frame y devuelve predicciones + instrucciones
+    
+    Args:
+        file: Imagen en formato JPEG/PNG (multipart/form-data)
+    
+    Returns:
+        JSON con detecciones, instrucciones y metadata
+    """
+    try:
+        # Validar tipo de contenido
+        content_type = file.content_type
+        if content_type and content_type not in _ALLOWED_CONTENT_TYPES:
+            logger.warning(f"Tipo de archivo no soportado: {content_type}")
+            raise HTTPException(
+                status_code=400,
+                detail="Tipo de archivo no soportado. Use JPEG, PNG o WebP."
+            )
+
+        # Leer imagen del request en streaming (sin materializar bytes completos)
+        # Logs del hot path en DEBUG y gateados con isEnabledFor: las
+        # f-strings se formatean antes de la llamada, así que sin el gate
+        # pagan el costo incluso con el nivel deshabilitado
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"📥 Recibiendo archivo: {file.filename}, tipo: {content_type}")
+        contents = await _read_upload(file)
+
+        # Revisar cache de frames duplicados (hash sobre bytes crudos)
+        cache_key = _prediction_cache_key(contents)
+        cached = _prediction_cache_get(cache_key)
+        if cached is not None:
+            logger.debug("⚡ Respuesta servida desde cache de predicciones")
+            return _encode_response(cached)
+
+        # Decodificar imagen
+        frame = _decode_image_from_bytes(contents)
+        height, width = frame.shape[:2]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"✅ Imagen decodificada: {width}x{height} píxeles")
+
+        # Procesar predicciones
+        response = await _process_predictions(frame)
+        _prediction_cache_put(cache_key, response)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"✅ Detecciones: {len(response['detections'])}, "
+                f"Instrucción: {response['instruction']['text'] if response['instruction'] else 'Ninguna'}"
+            )
+
+        return _encode_response(response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error en predicción: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error al procesar frame: {str(e)}")
+
+@app.post("/predict_base64")
+async def predict_base64(request: Request):
+    """
+    Endpoint alternativo: recibe frame en base64 (útil para testing)
+
+    El body se parsea a mano (orjson) en vez de un modelo Pydantic:
+    para un JSON de un solo campo string la validación del modelo
+    costaba decenas de microsegundos por request sin aportar nada.
+
+    Args:
+        request: Body JSON con campo "image" conteniendo base64 string
+
+    Returns:
+        JSON con detecciones e instrucciones
+    """
+    try:
+        try:
+            body = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Body JSON inválido")
+
+        image_data = body.get("image") if isinstance(body, dict) else None
+        if not isinstance(image_data, str) or not image_data:
+            raise HTTPException(status_code=400, detail="Campo 'image' requerido")
+
+        # Remover prefijo data:image si existe (partition evita la lista
+        # intermedia que alocaba split)
+        image_data = image_data.partition(",")[2] or image_data
+
+        # Validar que sea base64 válido (pybase64 usa SIMD si está disponible)
+        try:
+            if PYBASE64_AVAILABLE:
+                img_bytes = pybase64.b64decode(image_data, validate=True)
+            else:
+                img_bytes = base64.b64decode(image_data, validate=True)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Base64 inválido: {str(e)}"
+            )
+        
+        # Revisar cache de frames duplicados (hash sobre bytes decodificados)
+        cache_key = _prediction_cache_key(img_bytes, variant="base64")
+        response = _prediction_cache_get(cache_key)
+
+        if response is None:
+            # Decodificar imagen usando función compartida
+            frame = _decode_image_from_bytes(img_bytes)
+            height, width = frame.shape[:2]
+            logger.info(f"✅ Imagen base64 decodificada: {width}x{height} píxeles")
+
+            # Procesar predicciones (respuesta liviana: sin safe_zone ni
+            # campos de zona por detección, armada en una sola pasada)
+            response = await _process_predictions(
+                frame,
+                include_safe_zone=False,
+                include_per_det_zone=False
+            )
+            _prediction_cache_put(cache_key, response)
+
+        return _encode_response(response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error en predicción base64: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+if __name__ == "__main__":
+    import uvicorn
+    # loop/http en "auto": uvicorn elige uvloop + httptools cuando están
+    # instalados (Linux/Docker) y cae a asyncio/h11 donde no, p. ej. en
+    # Windows vía start_server.bat, donde uvloop no existe. Un worker por
+    # core (máx 4) escala la inferencia CPU entre procesos; con
+    # workers > 1 uvicorn requiere el import string en vez de la
+    # instancia de la app.
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=min(os.cpu_count() or 1, 4),
+        log_level="warning",
+    )
+
@@ -1,6 +1,165 @@
 import cv2
 import numpy as np
 import math
+import threading
+import time
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _largest_above(areas, min_area):
+    """
+    Índice del área máxima por sobre min_area, o -1.
+    Con numba instalado se compila a código nativo (importa con muchos
+    contornos por frame); sin numba corre la misma función en Python.
+    """
+    best = -1
+    best_area = min_area
+    for i in range(areas.shape[0]):
+        if areas[i] > best_area:
+            best = i
+            best_area = areas[i]
+    return best
+
+if NUMBA_AVAILABLE:
+    _largest_above = njit(cache=True)(_largest_above)
+
+# Escala a la que se corre la detección (el bbox se reescala al final)
+DETECT_SCALE = 0.5
+DETECT_SCALE_INV = 1.0 / DETECT_SCALE
+
+# Edad máxima de un frame antes de descartarlo sin procesar (latencia
+# sobre throughput: mejor saltarse un frame que medir una escena vieja)
+MAX_FRAME_AGE = 0.05
+
+# Cache de cv2.getTextSize: la medición FreeType se paga una vez por
+# texto en vez de en cada frame
+_text_size_cache = {}
+
+def get_text_size_cached(text, font, scale, thickness, key=None):
+    """
+    cv2.getTextSize con cache por (texto, fuente, escala, grosor).
+
+    Args:
+        key: Clave alternativa para el texto (ej: su largo, para strings
+             dinámicos como la distancia cuyo ancho depende de los dígitos)
+
+    Returns:
+        Tamaño (ancho, alto) del texto en píxeles
+    """
+    cache_key = (key if key is not None else text, font, scale, thickness)
+    size = _text_size_cache.get(cache_key)
+    if size is None:
+        size = cv2.getTextSize(text, font, scale, thickness)[0]
+        _text_size_cache[cache_key] = size
+    return size
+
+class CameraThread:
+    """
+    Captura de cámara en un hilo dedicado.
+    cap.read() bloquea (especialmente con webcams MJPEG) y acumula frames
+    viejos en el buffer del driver; leyendo en un hilo aparte y guardando
+    solo el último frame, el loop principal nunca espera por la cámara y
+    siempre procesa la escena actual.
+    """
+
+    def __init__(self, camera_index=0, mirror=False):
+        self.cap = cv2.VideoCapture(camera_index)
+        # Minimizar buffering del driver para no acumular frames viejos
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.mirror = mirror
+        self._frame = None
+        # True hasta que una lectura falle de verdad: al arrancar el hilo
+        # todavía no capturó nada y el caller debe esperar el primer frame
+        # (frame None), no interpretar el arranque como cámara caída
+        self._ret = True
+        self._timestamp = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._update, daemon=True)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        """Inicia el hilo de captura"""
+        self._thread.start()
+        return self
+
+    def _update(self):
+        """Loop del hilo: lee continuamente y guarda solo el último frame"""
+        while not self._stop_event.is_set():
+            ret, frame = self.cap.read()
+            with self._lock:
+                self._ret = ret
+                self._frame = frame
+                self._timestamp = time.monotonic()
+            if not ret:
+                break
+
+    def read(self):
+        """
+        Retorna una copia del último frame capturado.
+
+        Returns:
+            Tupla (ret, frame) igual que cv2.VideoCapture.read()
+        """
+        ret, frame, _ = self.read_latest()
+        return ret, frame
+
+    def read_latest(self):
+        """
+        Retorna el último frame junto a su timestamp de captura.
+
+        Returns:
+            Tupla (ret, frame, timestamp) con timestamp de time.monotonic()
+        """
+        with self._lock:
+            if self._frame is None:
+                return self._ret, None, self._timestamp
+            if self.mirror:
+                # Fusiona el espejo con la copia del snapshot: la vista
+                # negativa no copia y ascontiguousarray materializa en una
+                # sola pasada, ahorrando el cv2.flip aparte por frame
+                return (self._ret,
+                        np.ascontiguousarray(self._frame[:, ::-1]),
+                        self._timestamp)
+            return self._ret, self._frame.copy(), self._timestamp
+
+    def release(self):
+        """Detiene el hilo y libera la cámara"""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self.cap.release()
+
+
+class StaticTextOverlay:
+    """
+    Capa de texto estático pre-renderizada.
+    cv2.putText rasteriza glifos con FreeType en cada llamada; para los
+    textos que no cambian entre frames conviene dibujarlos una sola vez
+    en una capa + máscara y pegarlos al frame con una copia de memoria.
+    """
+
+    def __init__(self, shape):
+        height, width = shape[:2]
+        self._layer = np.zeros((height, width, 3), np.uint8)
+        self._mask = np.zeros((height, width), np.uint8)
+
+    def put_text(self, text, org, font, scale, color, thickness):
+        """Dibuja un texto en la capa (encadenable)"""
+        cv2.putText(self._layer, text, org, font, scale, color, thickness)
+        cv2.putText(self._mask, text, org, font, scale, 255, thickness)
+        return self
+
+    def apply(self, frame):
+        """Pega la capa sobre el frame (solo los píxeles con texto)"""
+        cv2.copyTo(self._layer, self._mask, frame)
+
 
 class DistanceMeasurer:
     """
@@ -20,7 +179,19 @@ class DistanceMeasurer:
         self.focal_length = focal_length
         self.known_width = known_width  # en cm
         self.known_height = known_height  # en cm
-        
+        # Último bbox detectado, para restringir la búsqueda a un ROI
+        self._last_bbox = None
+        # Offset del último escaneo (del ROI dentro del frame)
+        self._scan_offset = (0, 0)
+        # Numeradores known_width * focal_length ya calculados, para que
+        # la ruta caliente de distancia sea una sola división
+        self._numerator_cache = {}
+        # Kernel morfológico y buffers HSV/máscara reutilizados entre
+        # frames para no pagar alocaciones de varios MB a 30 FPS
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        self._hsv = None
+        self._mask = None
+
     def calculate_focal_length(self, known_distance, known_width, width_in_image):
         """
         Calcula la distancia focal usando un objeto de referencia.
@@ -31,23 +202,58 @@ class DistanceMeasurer:
             width_in_image: Ancho del objeto en píxeles en la imagen
         """
         self.focal_length = (width_in_image * known_distance) / known_width
+        # Los numeradores cacheados dependen de la focal: invalidar
+        self._numerator_cache.clear()
         print(f"Distancia focal calculada: {self.focal_length:.2f} píxeles")
         return self.focal_length
     
     def distance_to_camera(self, known_width, width_in_image):
         """
         Calcula la distancia al objeto usando el ancho conocido.
-        
+        Acepta escalares o arrays: con ndarrays calcula todas las
+        distancias en una sola operación vectorizada (útil para varios
+        objetos por frame sin loop de Python).
+
         Args:
-            known_width: Ancho real del objeto en cm
-            width_in_image: Ancho del objeto en píxeles en la imagen
-            
+            known_width: Ancho real del objeto en cm (escalar o ndarray)
+            width_in_image: Ancho del objeto en píxeles (escalar o ndarray)
+
         Returns:
-            Distancia en cm
+            Distancia en cm (escalar o ndarray según la entrada)
         """
         if self.focal_length is None:
             return None
-        return (known_width * self.focal_length) / width_in_image
+        if np.isscalar(known_width):
+            # known_width * focal_length es constante entre frames:
+            # cachearlo deja la ruta caliente en una sola división
+            numerator = self._numerator_cache.get(known_width)
+            if numerator is None:
+                numerator = known_width * self.focal_length
+                self._numerator_cache[known_width] = numerator
+        else:
+            numerator = known_width * self.focal_length
+        return np.divide(numerator, width_in_image)
+
+    def detect_valid_contours(self, contours, min_area=100):
+        """
+        Filtra los contornos válidos por área en forma vectorizada.
+
+        Args:
+            contours: Lista de contornos
+            min_area: Área mínima para considerar un contorno válido
+
+        Returns:
+            Lista de contornos válidos y ndarray con sus anchos en píxeles
+        """
+        if not contours:
+            return [], np.empty(0)
+
+        areas = np.fromiter(map(cv2.contourArea, contours),
+                            dtype=np.float64, count=len(contours))
+        valid = [c for c, keep in zip(contours, areas > min_area) if keep]
+        widths = np.fromiter((cv2.boundingRect(c)[2] for c in valid),
+                             dtype=np.float64, count=len(valid))
+        return valid, widths
     
     def detect_object_by_color(self, frame, lower_bound, upper_bound):
         """
@@ -61,17 +267,120 @@ class DistanceMeasurer:
         Returns:
             Contornos detectados y frame procesado
         """
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, lower_bound, upper_bound)
-        
-        # Operaciones morfológicas para limpiar la máscara
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # Encontrar contornos
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
+        return self._detect_tracked(frame, self._scan_for_color,
+                                    lower_bound, upper_bound)
+
+    def detect_object_by_bgr_range(self, frame):
+        """
+        Detecta la naranja con un predicado directo sobre BGR, sin pasar
+        por HSV. cvtColor cuesta varias operaciones por píxel; el rango
+        naranja [5,100,100]-[25,255,255] se aproxima bien con
+        R > 1.3*G, G > B y R > 80, todo con comparaciones vectorizadas.
+        Es la ruta caliente por defecto; la ruta HSV queda para afinar
+        rangos durante la calibración.
+
+        Args:
+            frame: Frame de la cámara
+
+        Returns:
+            Contornos detectados y frame procesado
+        """
+        return self._detect_tracked(frame, self._scan_bgr_orange)
+
+    def _detect_tracked(self, frame, scan, *scan_args):
+        """
+        Ejecuta un escaneo de color restringido al ROI del último bbox,
+        con fallback a frame completo cuando el objeto se pierde.
+
+        Args:
+            frame: Frame de la cámara
+            scan: Función de escaneo (imagen, *scan_args, offset=...)
+
+        Returns:
+            Contornos detectados y máscara
+        """
+        # Si ya sabemos dónde estaba el objeto, escanear solo un ROI
+        # ampliado alrededor del último bbox (el costo por píxel escala
+        # con el área convertida)
+        if self._last_bbox is not None:
+            x, y, w, h = self._last_bbox
+            pad = max(w, h)
+            frame_h, frame_w = frame.shape[:2]
+            x0 = max(x - pad, 0)
+            y0 = max(y - pad, 0)
+            x1 = min(x + w + pad, frame_w)
+            y1 = min(y + h + pad, frame_h)
+            roi = frame[y0:y1, x0:x1]
+            self._scan_offset = (x0, y0)
+            contours, mask = scan(roi, *scan_args, offset=(x0, y0))
+            if contours:
+                return contours, mask
+            # Objeto perdido: olvidar el bbox y reescanear el frame completo
+            self._last_bbox = None
+
+        self._scan_offset = (0, 0)
+        return scan(frame, *scan_args)
+
+    def _scan_bgr_orange(self, image, offset=(0, 0)):
+        """
+        Máscara naranja por predicado BGR + morfología + contornos.
+
+        Args:
+            image: Imagen BGR a escanear
+            offset: Desplazamiento (x, y) del ROI dentro del frame original
+
+        Returns:
+            Contornos detectados y máscara
+        """
+        b, g, r = cv2.split(image)
+        # R > 1.3*G (tono naranja), G > B (descarta rojos/magentas)
+        # y R > 80 (descarta zonas oscuras)
+        mask = cv2.compare(r, cv2.convertScaleAbs(g, alpha=1.3), cv2.CMP_GT)
+        cv2.bitwise_and(mask, cv2.compare(g, b, cv2.CMP_GT), dst=mask)
+        cv2.bitwise_and(mask, cv2.threshold(r, 80, 255, cv2.THRESH_BINARY)[1],
+                        dst=mask)
+
+        # Misma limpieza y extracción de contornos que la ruta HSV
+        cv2.erode(mask, self._kernel, dst=mask, iterations=1)
+        cv2.dilate(mask, self._kernel, dst=mask, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_TC89_L1, offset=offset)
+
+        return contours, mask
+
+    def _scan_for_color(self, image, lower_bound, upper_bound, offset=(0, 0)):
+        """
+        Máscara HSV + morfología + contornos sobre una imagen (frame o ROI).
+
+        Args:
+            image: Imagen BGR a escanear
+            lower_bound: Límite inferior del color en HSV
+            upper_bound: Límite superior del color en HSV
+            offset: Desplazamiento (x, y) del ROI dentro del frame original,
+                    aplicado a las coordenadas de los contornos
+
+        Returns:
+            Contornos detectados y máscara
+        """
+        # Reutilizar buffers (se realocan solo si cambia el tamaño del ROI)
+        if self._hsv is None or self._hsv.shape[:2] != image.shape[:2]:
+            self._hsv = np.empty_like(image)
+            self._mask = np.empty(image.shape[:2], np.uint8)
+
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=self._hsv)
+        mask = cv2.inRange(hsv, lower_bound, upper_bound, dst=self._mask)
+
+        # Limpiar la máscara: erode quita ruido puntual y el dilate doble
+        # rellena huecos del blob. Equivale a un open + close parcial con
+        # la mitad de pasadas sobre los píxeles que el par CLOSE + OPEN
+        # (cada morphologyEx son dos pasadas: dilate + erode)
+        cv2.erode(mask, self._kernel, dst=mask, iterations=1)
+        cv2.dilate(mask, self._kernel, dst=mask, iterations=2)
+
+        # Encontrar contornos (con offset quedan en coordenadas del frame)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_TC89_L1, offset=offset)
+
         return contours, mask
     
     def detect_largest_contour(self, contours, min_area=100):
@@ -87,16 +396,46 @@ class DistanceMeasurer:
         """
         if not contours:
             return None
-        
-        # Filtrar por área mínima
-        valid_contours = [c for c in contours if cv2.contourArea(c) > min_area]
-        
-        if not valid_contours:
-            return None
-        
-        # Retornar el contorno más grande
-        return max(valid_contours, key=cv2.contourArea)
+
+        # Áreas en batch (contourArea queda en C) y filtro + argmax en
+        # _largest_above, compilado con numba cuando está disponible
+        areas = np.fromiter(map(cv2.contourArea, contours),
+                            dtype=np.float32, count=len(contours))
+        idx = _largest_above(areas, min_area)
+        return contours[idx] if idx >= 0 else None
     
+    def detect_largest_blob(self, mask, min_area=100):
+        """
+        Obtiene el bbox del blob más grande de la máscara directamente
+        con connectedComponentsWithStats: una sola pasada en C que entrega
+        bbox y área por componente, sin extraer polígonos de contorno.
+
+        Args:
+            mask: Máscara binaria del último escaneo
+            min_area: Área mínima para considerar un blob válido
+
+        Returns:
+            Bounding box (x, y, w, h) en coordenadas del frame, o None
+        """
+        num_labels, _, stats, _ = cv2.connectedComponentsWithStats(
+            mask, connectivity=4)
+        if num_labels <= 1:
+            return None
+
+        # stats[0] es el fondo; argmax sobre el resto
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        idx = int(np.argmax(areas)) + 1
+        if stats[idx, cv2.CC_STAT_AREA] <= min_area:
+            return None
+
+        ox, oy = self._scan_offset
+        bbox = (int(stats[idx, cv2.CC_STAT_LEFT]) + ox,
+                int(stats[idx, cv2.CC_STAT_TOP]) + oy,
+                int(stats[idx, cv2.CC_STAT_WIDTH]),
+                int(stats[idx, cv2.CC_STAT_HEIGHT]))
+        self._last_bbox = bbox
+        return bbox
+
     def get_object_dimensions(self, contour):
         """
         Obtiene las dimensiones del objeto en píxeles.
@@ -108,6 +447,8 @@ class DistanceMeasurer:
             Ancho y alto en píxeles, y bounding box
         """
         x, y, w, h = cv2.boundingRect(contour)
+        # Recordar el bbox para que el próximo frame escanee solo un ROI
+        self._last_bbox = (x, y, w, h)
         return w, h, (x, y, w, h)
     
     def draw_measurement(self, frame, bbox, distance):
@@ -132,14 +473,17 @@ class DistanceMeasurer:
         # Mostrar distancia con fondo para mejor legibilidad
         if distance is not None:
             text = f"Distancia: {distance:.1f} cm"
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+            # Cachear por largo del string: el ancho solo cambia con la
+            # cantidad de dígitos y el rectángulo de fondo tolera el resto
+            text_size = get_text_size_cached(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2,
+                                             key=len(text))
             # Fondo negro semitransparente
             cv2.rectangle(frame, (x, y - 35), (x + text_size[0] + 10, y - 5), (0, 0, 0), -1)
-            cv2.putText(frame, text, (x + 5, y - 15), 
+            cv2.putText(frame, text, (x + 5, y - 15),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         else:
             text = "Calibrando..."
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+            text_size = get_text_size_cached(text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
             cv2.rectangle(frame, (x, y - 30), (x + text_size[0] + 10, y - 5), (0, 0, 0), -1)
             cv2.putText(frame, text, (x + 5, y - 10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
@@ -149,12 +493,15 @@ def main():
     """
     Función principal para ejecutar la medición de distancia.
     """
-    # Inicializar cámara
-    cap = cv2.VideoCapture(0)
-    
+    # Inicializar cámara (captura en hilo dedicado para no bloquear el
+    # loop; mirror=True entrega el frame ya espejado sin flip extra)
+    cap = CameraThread(0, mirror=True)
+
     if not cap.isOpened():
         print("Error: No se pudo abrir la cámara")
         return
+
+    cap.start()
     
     # Configuración inicial para detectar naranjas
     # Rango HSV para color naranja (entre rojo y amarillo)
@@ -166,6 +513,15 @@ def main():
     
     # Modo de calibración
     calibration_mode = True
+    # Ventana de máscara apagada por defecto: cada imshow es una copia
+    # completa + push al event loop de la GUI (se activa con 'd')
+    show_mask = False
+    # Capas de texto estático por estado, renderizadas una sola vez
+    # cuando se conoce el tamaño del frame
+    overlays = None
+    # Strips cacheados de la línea "Ancho detectado", por bucket de 2 px:
+    # el texto solo se re-rasteriza cuando el ancho cambia de bucket
+    width_line_cache = {}
     calibration_distance = 30  # Distancia conocida en cm para calibración
     known_object_width = 7.5  # Diámetro promedio de una naranja en cm
     
@@ -176,79 +532,109 @@ def main():
     print(f"1. Coloca la naranja a {calibration_distance} cm de la cámara")
     print(f"2. Asegúrate de que la naranja esté bien iluminada y visible")
     print("3. Presiona 'c' para calibrar cuando la naranja esté claramente detectada")
-    print("4. Presiona 'q' para salir")
+    print("4. Presiona 'd' para mostrar/ocultar la mascara de deteccion")
+    print("5. Presiona 'q' para salir")
     print("\nLa naranja debe estar completamente visible en la imagen")
     print("=" * 60)
     
     while True:
-        ret, frame = cap.read()
+        ret, frame, frame_ts = cap.read_latest()
         if not ret:
             break
-        
-        # Voltear frame horizontalmente para efecto espejo
-        frame = cv2.flip(frame, 1)
-        
-        # Detectar naranja
-        contours, mask = measurer.detect_object_by_color(frame, lower_orange, upper_orange)
-        largest_contour = measurer.detect_largest_contour(contours, min_area=500)
+        if frame is None or time.monotonic() - frame_ts > MAX_FRAME_AGE:
+            # Sin frame aún, o frame más viejo que MAX_FRAME_AGE: no
+            # gastar detección en una escena atrasada, refrescar la GUI
+            # (la última imagen procesada sigue en pantalla) y reintentar
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+            continue
+
+        # Detectar naranja sobre una versión reducida a la mitad: 4x menos
+        # píxeles para HSV/morfología/contornos, el bbox se reescala después
+        small = cv2.resize(frame, None, fx=DETECT_SCALE, fy=DETECT_SCALE,
+                           interpolation=cv2.INTER_AREA)
+        if calibration_mode:
+            # Ruta HSV: los rangos son ajustables para afinar la calibración
+            contours, mask = measurer.detect_object_by_color(small, lower_orange, upper_orange)
+        else:
+            # Ruta caliente: predicado BGR directo, sin cvtColor
+            contours, mask = measurer.detect_object_by_bgr_range(small)
+        # Bbox del blob más grande directo desde la máscara (sin contornos)
+        blob_bbox = measurer.detect_largest_blob(
+            mask, min_area=int(500 * DETECT_SCALE * DETECT_SCALE))
         
         distance = None
-        
-        # Información general en pantalla
-        info_y = 30
-        cv2.putText(frame, "NARANJA DETECTADA" if largest_contour is not None else "BUSCANDO NARANJA...", 
-                   (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 
-                   (0, 255, 0) if largest_contour is not None else (0, 0, 255), 2)
-        
-        if largest_contour is not None:
-            w, h, bbox = measurer.get_object_dimensions(largest_contour)
-            
+
+        # Renderizar las capas de texto estático una sola vez por estado;
+        # en el loop solo se pegan con una copia de memoria
+        if overlays is None:
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            bottom_y = frame.shape[0] - 20
+            overlays = {
+                'calibracion': StaticTextOverlay(frame.shape)
+                    .put_text("NARANJA DETECTADA", (10, 30), font, 0.7, (0, 255, 0), 2)
+                    .put_text("MODO CALIBRACION", (10, 65), font, 0.6, (0, 255, 255), 2)
+                    .put_text(f"Coloca la naranja a {calibration_distance} cm",
+                              (10, 90), font, 0.5, (255, 255, 255), 1)
+                    .put_text("Presiona 'c' para calibrar", (10, 140), font, 0.5, (0, 255, 255), 2)
+                    .put_text("Presiona 'q' para salir", (10, bottom_y), font, 0.5, (255, 255, 255), 1),
+                'medicion': StaticTextOverlay(frame.shape)
+                    .put_text("NARANJA DETECTADA", (10, 30), font, 0.7, (0, 255, 0), 2)
+                    .put_text("MODO MEDICION", (10, 65), font, 0.6, (0, 255, 0), 2)
+                    .put_text("Presiona 'q' para salir", (10, bottom_y), font, 0.5, (255, 255, 255), 1),
+                'buscando': StaticTextOverlay(frame.shape)
+                    .put_text("BUSCANDO NARANJA...", (10, 30), font, 0.7, (0, 0, 255), 2)
+                    .put_text("No se detecto naranja", (10, 65), font, 0.5, (0, 0, 255), 1)
+                    .put_text("Asegurate de buena iluminacion", (10, 90), font, 0.5, (255, 255, 255), 1)
+                    .put_text("Presiona 'q' para salir", (10, bottom_y), font, 0.5, (255, 255, 255), 1),
+            }
+
+        if blob_bbox is not None:
+            # Reescalar a píxeles del frame original para dibujar y medir
+            bbox = tuple(int(v * DETECT_SCALE_INV) for v in blob_bbox)
+            w, h = bbox[2], bbox[3]
+
             if calibration_mode:
-                # Mostrar información de calibración
-                info_y += 35
-                cv2.putText(frame, "MODO CALIBRACION", 
-                           (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-                info_y += 25
-                cv2.putText(frame, f"Coloca la naranja a {calibration_distance} cm", 
-                           (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                info_y += 25
-                cv2.putText(frame, f"Ancho detectado: {w} px", 
-                           (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                info_y += 25
-                cv2.putText(frame, "Presiona 'c' para calibrar", 
-                           (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
+                overlays['calibracion'].apply(frame)
+                # Único texto dinámico: se rasteriza en un strip chico solo
+                # cuando el ancho cambia de bucket y después solo se copia
+                w_bucket = w // 2
+                entry = width_line_cache.get(w_bucket)
+                if entry is None:
+                    strip = np.zeros((30, 300, 3), np.uint8)
+                    cv2.putText(strip, f"Ancho detectado: {w} px", (10, 20),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                    entry = (strip, strip.any(axis=2))
+                    width_line_cache[w_bucket] = entry
+                strip, text_mask = entry
+                region = frame[95:125, 0:300]
+                region[text_mask] = strip[text_mask]
             else:
                 # Calcular distancia
                 if measurer.focal_length is not None:
                     distance = measurer.distance_to_camera(known_object_width, w)
-                    info_y += 35
-                    cv2.putText(frame, "MODO MEDICION", 
-                               (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-            
+                overlays['medicion'].apply(frame)
+
             # Dibujar medición
             measurer.draw_measurement(frame, bbox, distance)
         else:
-            info_y += 35
-            cv2.putText(frame, "No se detecto naranja", 
-                       (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-            info_y += 25
-            cv2.putText(frame, "Asegurate de buena iluminacion", 
-                       (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        # Instrucciones en la parte inferior
-        cv2.putText(frame, "Presiona 'q' para salir", 
-                   (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            overlays['buscando'].apply(frame)
         
-        # Mostrar frames
+        # Mostrar frames (la máscara solo en modo debug)
         cv2.imshow('Medicion de Distancia - Naranja', frame)
-        cv2.imshow('Mascara de Deteccion', mask)
-        
+        if show_mask:
+            cv2.imshow('Mascara de Deteccion', mask)
+
         # Controles
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
             break
-        elif key == ord('c') and largest_contour is not None and calibration_mode:
-            w, h, bbox = measurer.get_object_dimensions(largest_contour)
+        elif key == ord('d'):
+            show_mask = not show_mask
+            if not show_mask:
+                cv2.destroyWindow('Mascara de Deteccion')
+        elif key == ord('c') and blob_bbox is not None and calibration_mode:
+            # w ya viene reescalado a píxeles del frame original
             measurer.calculate_focal_length(calibration_distance, known_object_width, w)
             calibration_mode = False
             print(f"\nCalibración completada!")
@@ -10,9 +10,15 @@ except ImportError:
     TTS_AVAILABLE = False
 
 import logging
+import queue
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Voz en español ya encontrada: evita reescanear la lista de voces
+# (con .lower() por voz) si FeedbackManager se vuelve a instanciar
+_spanish_voice_id = None
+
 class FeedbackManager:
     """
     Gestor de feedback de audio usando pyttsx3
@@ -29,20 +35,32 @@ class FeedbackManager:
                 self.engine = pyttsx3.init()
                 self.is_initialized = True
                 
-                # Configurar propiedades de voz
-                voices = self.engine.getProperty('voices')
-                
-                # Buscar voz en español si está disponible
-                for voice in voices:
-                    if 'spanish' in voice.name.lower() or 'es' in voice.id.lower():
-                        self.engine.setProperty('voice', voice.id)
-                        logger.info(f"Voz en español seleccionada: {voice.name}")
-                        break
+                # Buscar voz en español si está disponible (el escaneo
+                # se hace una sola vez y se cachea a nivel de módulo)
+                global _spanish_voice_id
+                if _spanish_voice_id is not None:
+                    self.engine.setProperty('voice', _spanish_voice_id)
+                else:
+                    voices = self.engine.getProperty('voices')
+                    for voice in voices:
+                        if 'spanish' in voice.name.lower() or 'es' in voice.id.lower():
+                            _spanish_voice_id = voice.id
+                            self.engine.setProperty('voice', voice.id)
+                            logger.info(f"Voz en español seleccionada: {voice.name}")
+                            break
                 
                 # Configurar velocidad y volumen
                 self.engine.setProperty('rate', 150)  # Velocidad de habla
                 self.engine.setProperty('volume', 1.0)  # Volumen (0.0 a 1.0)
                 
+                # Hilo consumidor: runAndWait() bloquea por toda la
+                # duración del audio, así que se habla en background y
+                # say() retorna de inmediato
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._speech_loop,
+                                                daemon=True)
+                self._worker.start()
+
                 logger.info("✅ FeedbackManager inicializado")
             except Exception as e:
                 logger.warning(f"No se pudo inicializar pyttsx3: {str(e)}")
@@ -50,31 +68,59 @@ class FeedbackManager:
         else:
             logger.info("pyttsx3 no disponible. El feedback de audio se manejará en el frontend.")
     
+    def _speech_loop(self):
+        """Loop del hilo de audio: consume la cola y habla"""
+        while True:
+            text = self._queue.get()
+            try:
+                self.engine.say(text)
+                self.engine.runAndWait()
+            except Exception as e:
+                logger.error(f"Error al reproducir audio: {str(e)}")
+
     def say(self, text: str):
         """
-        Reproduce texto como audio
-        
+        Encola texto para reproducir como audio (no bloquea al caller)
+
         Args:
             text: Texto a pronunciar
         """
         if not self.is_initialized or not self.engine:
             logger.debug(f"Feedback de audio no disponible. Texto: {text}")
             return
-        
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            logger.error(f"Error al reproducir audio: {str(e)}")
-    
+
+        # Si ya hay mensajes acumulados, descartar el nuevo: en un loop
+        # en tiempo real es mejor perder un aviso que hablar con atraso
+        if self._queue.qsize() > 2:
+            logger.debug(f"Cola de audio llena, descartando: {text}")
+            return
+        self._queue.put_nowait(text)
+
     def stop(self):
-        """Detiene cualquier audio en reproducción"""
+        """Vacía la cola y detiene cualquier audio en reproducción"""
         if self.engine:
+            try:
+                while not self._queue.empty():
+                    self._queue.get_nowait()
+            except queue.Empty:
+                pass
             try:
                 self.engine.stop()
             except:
                 pass
 
-# Instancia global (opcional, para uso en backend si se necesita)
-feedback_manager = FeedbackManager()
+# Singleton lazy: pyttsx3.init() es caro (lanza espeak / carga el motor
+# del sistema) y no tiene sentido pagarlo al importar el módulo si nadie
+# usa el feedback de audio del backend
+_feedback_manager = None
+
+def get_feedback_manager():
+    """
+    Retorna la instancia global de FeedbackManager, creándola recién
+    en el primer uso para no frenar el arranque del backend.
+    """
+    global _feedback_manager
+    if _feedback_manager is None:
+        _feedback_manager = FeedbackManager()
+    return _feedback_manager
 
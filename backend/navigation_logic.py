@@ -4,15 +4,274 @@ Convierte detecciones en instrucciones de voz simples
 """
 
 from typing import List, Dict, Optional
-import logging
+from operator import itemgetter
+import math
+import time
 
-logger = logging.getLogger(__name__)
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Sin logger: este modulo corre una vez por frame y no loguea nada.
+# Si algún día se agrega logging de debug aquí, proteger con
+# logger.isEnabledFor(logging.DEBUG) antes de formatear el mensaje.
+
+# Tamaños reales estimados en metros (altura típica) por clase
+REAL_HEIGHTS = {
+    'person': 1.7,      # Altura promedio de una persona: ~170cm
+    'car': 1.5,         # Altura promedio de un auto: ~150cm
+    'truck': 2.5,       # Altura promedio de un camión: ~250cm
+    'bus': 3.0,         # Altura promedio de un autobús: ~300cm
+    'motorcycle': 1.2,   # Altura promedio de una moto: ~120cm
+    'bicycle': 1.0,     # Altura promedio de una bicicleta: ~100cm
+    'chair': 0.9,       # Altura promedio de una silla: ~90cm
+    'bench': 0.5,       # Altura promedio de un banco: ~50cm
+    'traffic light': 3.0, # Altura típica de un semáforo: ~300cm
+    'unknown': 1.0      # Tamaño por defecto: ~100cm
+}
+
+# Mismas alturas indexadas por class id de COCO: el detector adjunta
+# d['class_id'] y acá el lookup es un gather O(1) en el array, sin
+# hashear strings ni .lower() por objeto. Ids no mapeados quedan en 1.0
+# (el mismo default que REAL_HEIGHTS['unknown'])
+_REAL_HEIGHTS_ARR = np.full(80, 1.0, dtype=np.float32)
+for _cls_id, _height in ((0, 1.7),   # person
+                         (1, 1.0),   # bicycle
+                         (2, 1.5),   # car
+                         (3, 1.2),   # motorcycle
+                         (5, 3.0),   # bus
+                         (7, 2.5),   # truck
+                         (9, 3.0),   # traffic light
+                         (13, 0.5),  # bench
+                         (56, 0.9)): # chair
+    _REAL_HEIGHTS_ARR[_cls_id] = _height
+
+# Piso de confianza: nada río abajo acepta menos (semáforos exigen 0.4,
+# cruces 0.3, autos peligrosos 0.6) y el detector ya corta en 0.5; el
+# filtro protege frente a callers con umbrales más laxos
+MIN_CONFIDENCE = 0.3
+
+# Constante de la fórmula de distancia: d = K / sqrt(size_ratio)
+# Calibrada para coincidir con la tabla anterior (size_ratio 0.1 → ~1 m)
+DISTANCE_K = 0.32
+
+# Plantillas de instrucciones: los campos constantes se alocan una sola
+# vez; cada uso retorna un .copy() y parcha solo lo dinámico (texto,
+# obstacle_count), evitando reconstruir el dict literal por frame
+_TL_RED = {
+    'text': '⚠️ Semáforo en rojo. Espera antes de cruzar.',
+    'priority': 10,
+    'type': 'traffic_light',
+    'action': 'stop'
+}
+_TL_YELLOW = {
+    'text': '⚠️ Semáforo en amarillo. Ten precaución.',
+    'priority': 9,
+    'type': 'traffic_light',
+    'action': 'caution'
+}
+_TL_GREEN = {
+    'text': '✅ Semáforo en verde. Puedes cruzar con precaución.',
+    'priority': 8,
+    'type': 'traffic_light',
+    'action': 'go'
+}
+_TL_UNKNOWN = {
+    'text': '🔴 Semáforo detectado. Verifica el estado antes de cruzar.',
+    'priority': 7,
+    'type': 'traffic_light',
+    'action': 'check'
+}
+_CROSSWALK = {
+    'text': '🚶 Paso de peatones detectado. Verifica el tráfico antes de cruzar.',
+    'priority': 5,
+    'type': 'crosswalk',
+    'action': 'caution'
+}
+_SAFE_ZONE_CLEAR = {
+    'text': '✅ Zona segura libre. Sigue recto.',
+    'priority': 3,
+    'type': 'safe_zone',
+    'action': 'go_forward',
+    'direction': 'forward'
+}
+_SAFE_ZONE_BLOCKED_RIGHT = {
+    'text': '',  # se parcha con la clase del obstáculo
+    'priority': 9,
+    'type': 'safe_zone',
+    'action': 'move_right',
+    'direction': 'right',
+    'obstacle_count': 0
+}
+_SAFE_ZONE_BLOCKED_LEFT = {
+    'text': '',  # se parcha con la clase del obstáculo
+    'priority': 9,
+    'type': 'safe_zone',
+    'action': 'move_left',
+    'direction': 'left',
+    'obstacle_count': 0
+}
+# Índice 1 = el objeto está a la izquierda del centro → moverse a la
+# derecha (mismo convenio 0/1 que la dirección del resto del módulo);
+# permite elegir plantilla y palabra indexando, sin rama por obstáculo
+_SAFE_ZONE_BLOCKED = (_SAFE_ZONE_BLOCKED_LEFT, _SAFE_ZONE_BLOCKED_RIGHT)
+_SAFE_ZONE_MOVE_WORD = ('izquierda', 'derecha')
+
+_CAR_WARNING = {
+    'text': '',  # se parcha con la distancia
+    'priority': 8,
+    'type': 'obstacle',
+    'action': 'caution',
+    'direction': 'center'
+}
+_OBSTACLE_CENTER = {
+    'text': '',  # se parcha con la clase del obstáculo
+    'priority': 9,
+    'type': 'obstacle',
+    'action': 'stop',
+    'direction': 'center'
+}
+_OBSTACLE_BOTH = {
+    'text': '⚠️ Obstáculos a ambos lados. Continúa con precaución.',
+    'priority': 7,
+    'type': 'obstacle',
+    'action': 'caution',
+    'direction': 'both'
+}
+_OBSTACLE_LEFT = {
+    'text': '',  # se parcha con la clase del obstáculo
+    'priority': 6,
+    'type': 'obstacle',
+    'action': 'move_right',
+    'direction': 'left'
+}
+_OBSTACLE_RIGHT = {
+    'text': '',  # se parcha con la clase del obstáculo
+    'priority': 6,
+    'type': 'obstacle',
+    'action': 'move_left',
+    'direction': 'right'
+}
+
+def _in_trapezoid(obj_x, obj_y, obj_w, obj_h,
+                  top_y, bottom_y, top_width, bottom_width, center_x):
+    """
+    Núcleo numérico del test de trapecio (centro dentro + superposición
+    significativa >25%), con la zona desempaquetada en escalares.
+    Con numba instalado se compila a código nativo; sin numba corre la
+    misma función en Python.
+    """
+    # Rechazo AABB barato: la extensión horizontal máxima del trapecio es
+    # bottom_width centrada en center_x. Un bbox completamente fuera de
+    # ese rectángulo no puede ni contener su centro ni superponerse;
+    # descarta la mayoría de los objetos antes de cualquier interpolación
+    half_bw = bottom_width * 0.5
+    if (obj_x + obj_w < center_x - half_bw or obj_x > center_x + half_bw
+            or obj_y + obj_h < top_y or obj_y > bottom_y):
+        return False
+
+    obj_center_x = obj_x + obj_w / 2
+    obj_center_y = obj_y + obj_h / 2
+
+    # Centro vertical dentro del trapecio
+    if not (top_y <= obj_center_y <= bottom_y):
+        return False
+
+    # Un solo divide: las tres razones verticales multiplican por el
+    # inverso (la división FP cuesta varias veces lo que una
+    # multiplicación); delta_width también se hoistea de sus tres usos
+    inv_height = 1.0 / (bottom_y - top_y)
+    delta_width = bottom_width - top_width
+
+    # Ancho del trapecio a la altura del centro (interpolación lineal)
+    y_ratio = (obj_center_y - top_y) * inv_height
+    width_at_y = top_width + delta_width * y_ratio
+    left_bound = center_x - width_at_y / 2
+    right_bound = center_x + width_at_y / 2
+    # Caso común (objeto claramente en el corredor): basta el test del
+    # centro, sin pagar la aritmética de superposición que sigue
+    if left_bound <= obj_center_x <= right_bound:
+        return True
+
+    # Superposición con la zona
+    obj_top = obj_y
+    obj_bottom = obj_y + obj_h
+    if obj_bottom < top_y or obj_top > bottom_y:
+        return False
+
+    # Clamps y min/max desenrollados como condicionales encadenados: en
+    # CPython evitan la llamada a min/max con tupla de argumentos; con
+    # numba bajan directo a instrucciones minss/maxss
+    obj_top_ratio = (obj_top - top_y) * inv_height
+    if obj_top_ratio < 0.0:
+        obj_top_ratio = 0.0
+    elif obj_top_ratio > 1.0:
+        obj_top_ratio = 1.0
+    obj_bottom_ratio = (obj_bottom - top_y) * inv_height
+    if obj_bottom_ratio < 0.0:
+        obj_bottom_ratio = 0.0
+    elif obj_bottom_ratio > 1.0:
+        obj_bottom_ratio = 1.0
+
+    width_at_obj_top = top_width + delta_width * obj_top_ratio
+    width_at_obj_bottom = top_width + delta_width * obj_bottom_ratio
+
+    left_at_obj_top = center_x - width_at_obj_top / 2
+    right_at_obj_top = center_x + width_at_obj_top / 2
+    left_at_obj_bottom = center_x - width_at_obj_bottom / 2
+    right_at_obj_bottom = center_x + width_at_obj_bottom / 2
+
+    obj_left = obj_x
+    obj_right = obj_x + obj_w
+
+    overlap_left = left_at_obj_top if left_at_obj_top > left_at_obj_bottom else left_at_obj_bottom
+    if obj_left > overlap_left:
+        overlap_left = obj_left
+    overlap_right = right_at_obj_top if right_at_obj_top < right_at_obj_bottom else right_at_obj_bottom
+    if obj_right < overlap_right:
+        overlap_right = obj_right
+
+    if overlap_left < overlap_right:
+        overlap_width = overlap_right - overlap_left
+        overlap_bottom = obj_bottom if obj_bottom < bottom_y else bottom_y
+        overlap_top = obj_top if obj_top > top_y else top_y
+        overlap_height = overlap_bottom - overlap_top
+        overlap_area = overlap_width * overlap_height
+        obj_area = obj_w * obj_h
+
+        # Si hay superposición significativa (>25% del objeto)
+        return overlap_area > obj_area * 0.25
+
+    return False
+
+if NUMBA_AVAILABLE:
+    _in_trapezoid = njit(cache=True, fastmath=True)(_in_trapezoid)
+    # Warm-up: compilar en el import y no en el primer frame
+    _in_trapezoid(0.0, 0.0, 1.0, 1.0, 0.0, 10.0, 1.0, 2.0, 5.0)
 
 class NavigationLogic:
     """
     Genera instrucciones de navegación basadas en detecciones
     """
-    
+
+    # Sin __dict__ por instancia: acceso a atributos más rápido en los
+    # métodos que corren por frame y menos memoria. Cualquier atributo
+    # nuevo debe agregarse acá.
+    __slots__ = (
+        'frame_width', 'frame_height', 'danger_zone',
+        'safe_zone_bottom_width_ratio', 'safe_zone_top_width_ratio',
+        'safe_zone_height_ratio', 'safe_zone_bottom_margin',
+        'last_instruction_time', 'instruction_cooldown',
+        '_safe_zone_cache', '_safe_zone_cache_key',
+        '_zone_top_y', '_zone_bottom_y', '_zone_top_width',
+        '_zone_bottom_width', '_zone_center_x',
+        '_last_signature', '_last_instruction',
+    )
+
     def __init__(self):
         self.frame_width = 640
         self.frame_height = 480
@@ -29,6 +288,24 @@ class NavigationLogic:
         
         self.last_instruction_time = {}
         self.instruction_cooldown = 2000  # 2 segundos entre instrucciones similares
+
+        # Cache de la zona segura: solo depende de las dimensiones del
+        # frame, así que se recalcula únicamente cuando estas cambian.
+        # Los escalares del trapecio se guardan además como atributos
+        # (_zone_*) para que la geometría por objeto no indexe el dict
+        self._safe_zone_cache = None
+        self._safe_zone_cache_key = None
+        self._zone_top_y = 0.0
+        self._zone_bottom_y = 0.0
+        self._zone_top_width = 0.0
+        self._zone_bottom_width = 0.0
+        self._zone_center_x = 0.0
+
+        # Memoización temporal: firma de las detecciones del frame
+        # anterior y la instrucción que produjeron, para saltarse todo el
+        # pipeline cuando la escena no cambió (el caso común caminando)
+        self._last_signature = None
+        self._last_instruction = None
     
     def process_detections(self, detections: List[Dict], frame_width: int = 640, frame_height: int = 480) -> Optional[Dict]:
         """
@@ -44,15 +321,88 @@ class NavigationLogic:
         """
         self.frame_width = frame_width
         self.frame_height = frame_height
-        
-        if not detections or len(detections) == 0:
+
+        if not detections:
             return None
-        
-        # Categorizar detecciones
-        traffic_lights = [d for d in detections if d.get('type') == 'traffic_light']
-        # crosswalks = [d for d in detections if d.get('type') == 'crosswalk']  # DESACTIVADO temporalmente
-        obstacles = [d for d in detections if d.get('type') == 'obstacle']
-        
+
+        # Descartar ruido bajo el piso de confianza antes de categorizar;
+        # la lista solo se reconstruye si de verdad hay algo que filtrar
+        if any(d.get('confidence', 1.0) < MIN_CONFIDENCE for d in detections):
+            detections = [d for d in detections
+                          if d.get('confidence', 1.0) >= MIN_CONFIDENCE]
+            if not detections:
+                return None
+
+        # Firma cuantizada de la escena: clase + estado + confianza en
+        # buckets de 0.1 + bbox en buckets de 16 px. Si coincide con el
+        # frame anterior, la geometría daría lo mismo: reutilizar la
+        # instrucción PRE-cooldown y aplicar el cooldown recién al
+        # retornar (memoizar el resultado post-cooldown congelaría un
+        # None suprimido mientras la escena no cambie). Los buckets de
+        # confianza caen justo en los umbrales 0.3/0.4/0.6, así un cruce
+        # de umbral siempre invalida la firma
+        signature = hash(tuple(sorted(
+            (d.get('class') or '', d.get('state') or '',
+             int(d.get('confidence', 1.0) * 10),
+             int(d['bbox'][0]) // 16, int(d['bbox'][1]) // 16,
+             int(d['bbox'][2]) // 16, int(d['bbox'][3]) // 16)
+            for d in detections)))
+        if signature == self._last_signature:
+            cached = self._last_instruction
+            if cached is None:
+                return None
+            return self._check_cooldown(dict(cached))
+
+        instruction = self._generate_instruction(detections)
+        self._last_signature = signature
+        if instruction is None:
+            self._last_instruction = None
+            return None
+        self._last_instruction = dict(instruction)
+        return self._check_cooldown(instruction)
+
+    def _generate_instruction(self, detections: List[Dict]) -> Optional[Dict]:
+        """
+        Pipeline completo de categorización + geometría + prioridades
+        (separado de process_detections para poder memoizar por firma).
+        Devuelve la instrucción CRUDA, sin cooldown: el cooldown lo
+        aplica process_detections al retornar, para que el memo nunca
+        guarde un None suprimido
+
+        Args:
+            detections: Lista de detecciones del detector
+
+        Returns:
+            Dict con instrucción (text, priority, type, action) o None
+        """
+        # Fast path: en vereda despejada lo normal es 0-1 detecciones;
+        # con una sola no hay nada que particionar ni vectorizar
+        if len(detections) == 1:
+            return self._generate_instruction_single(detections[0])
+
+        # Particionar y extraer campos en UNA sola pasada: antes eran
+        # varias comprensiones recorriendo la lista completa cada una,
+        # con .get() repetidos por objeto
+        traffic_lights = []
+        cars = []
+        obstacle_dets = []
+        obstacle_bbox_rows = []
+        obstacle_types = []
+        obstacle_class_ids = []
+        # crosswalks: type == 'crosswalk'  # DESACTIVADO temporalmente
+        for d in detections:
+            det_type = d.get('type')
+            if det_type == 'traffic_light':
+                traffic_lights.append(d)
+            elif det_type == 'obstacle':
+                obstacle_dets.append(d)
+                obstacle_bbox_rows.append(d['bbox'])
+                obstacle_types.append(d.get('class', 'unknown'))
+                obstacle_class_ids.append(d.get('class_id', -1))
+            if d.get('class') == 'car' or d.get('class_es') == 'auto':
+                cars.append(d)
+
+
         # Prioridad 1: Semáforos (máxima prioridad)
         if traffic_lights:
             instruction = self._process_traffic_light(traffic_lights[0])
@@ -61,28 +411,58 @@ class NavigationLogic:
         
         # Obtener zona segura (fija, no se ajusta)
         safe_zone_coords = self.get_safe_zone_coordinates()
-        
-        # FILTRAR: Solo considerar objetos dentro de la zona segura (excepto autos y semáforos)
-        # Los autos se detectan siempre (pueden estar fuera de la zona)
-        # Los semáforos se detectan siempre (están arriba)
-        filtered_obstacles = self._filter_objects_by_safe_zone(obstacles)
-        
+
+        # Geometría por detección en batch: pertenencia a la zona,
+        # distancia y dirección se calculan con operaciones de array en
+        # vez de un loop de Python por objeto. La excepción de autos
+        # (siempre visibles) no afecta este paso: fuera de la zona igual
+        # no cuentan como obstáculo del corredor.
+        safe_zone_obstacles = []
+        if obstacle_dets:
+            obstacle_bboxes = np.asarray(obstacle_bbox_rows, dtype=np.float32)
+            in_zone = self.objects_in_safe_zone_mask(obstacle_bboxes)
+            distances = self._calculate_distances(obstacle_bboxes, obstacle_types,
+                                                  obstacle_class_ids)
+            # 1 = moverse a la derecha (objeto a la izquierda del centro)
+            directions = obstacle_bboxes[:, 0] + obstacle_bboxes[:, 2] / 2 < self._zone_center_x
+
+            # Anotar la distancia en TODAS las detecciones (no solo las de
+            # la zona): los autos reusan este valor en _process_cars sin
+            # recalcular la fórmula escalar por auto
+            for i, obs in enumerate(obstacle_dets):
+                distance_meters = float(distances[i])
+                obs['distance_meters'] = distance_meters
+                # Solo considerar si está en la zona y a menos de 2 metros
+                if in_zone[i] and distance_meters < 2.0:
+                    # Mutar el dict existente en vez de copiarlo con
+                    # {**obs, ...} (ahorra una copia de ~10 claves por objeto)
+                    obs['distance'] = distance_meters
+                    obs['in_safe_zone'] = True
+                    obs['direction'] = int(directions[i])
+                    safe_zone_obstacles.append(obs)
+
+            # _process_safe_zone_obstacles solo consume el más cercano
+            # ([0]) y el conteo: basta llevar el mínimo al frente en O(N)
+            # en vez de ordenar la lista completa
+            if len(safe_zone_obstacles) > 1:
+                closest = min(safe_zone_obstacles, key=itemgetter('distance'))
+                if safe_zone_obstacles[0] is not closest:
+                    idx = safe_zone_obstacles.index(closest)
+                    safe_zone_obstacles[0], safe_zone_obstacles[idx] = closest, safe_zone_obstacles[0]
+
         # Prioridad 2: Zona segura (obstáculos bloqueando el camino)
-        safe_zone_obstacles = self._get_obstacles_in_safe_zone(filtered_obstacles)
         if safe_zone_obstacles:
             instruction = self._process_safe_zone_obstacles(safe_zone_obstacles)
             if instruction:
                 return instruction
-        
         # Prioridad 3: Zona segura libre (instrucción positiva)
-        if not safe_zone_obstacles and obstacles:
+        elif obstacle_dets:
             # Hay obstáculos pero no en la zona segura
             instruction = self._process_safe_zone_clear()
             if instruction:
                 return instruction
-        
+
         # Prioridad 4: Autos (siempre detectados, incluso fuera de zona segura)
-        cars = [d for d in detections if d.get('class') == 'car' or d.get('class_es') == 'auto']
         if cars:
             # Filtrar solo autos cercanos o en zona de peligro
             dangerous_cars = [c for c in cars if self._is_dangerous_object(c)]
@@ -97,12 +477,53 @@ class NavigationLogic:
         #     if instruction:
         #         return instruction
         
-        # Si no hay detecciones pero el sistema está activo, confirmar zona segura
-        if not detections:
-            return self._process_safe_zone_clear()
-        
         return None
     
+    def _generate_instruction_single(self, d: Dict) -> Optional[Dict]:
+        """
+        Versión directa del pipeline para una sola detección: mismo orden
+        de prioridades que _generate_instruction pero despachando por el
+        tipo del único objeto, sin listas intermedias ni arrays.
+
+        Args:
+            d: La única detección del frame
+
+        Returns:
+            Dict con instrucción o None
+        """
+        if d.get('type') == 'traffic_light':
+            return self._process_traffic_light(d)
+
+        safe_zone_coords = self.get_safe_zone_coordinates()
+
+        if d.get('type') == 'obstacle':
+            blocking = False
+            if self._is_object_in_safe_zone(d['bbox'], safe_zone_coords):
+                distance_meters = self._calculate_distance(d['bbox'], d.get('class', 'unknown'),
+                                                           d.get('class_id'))
+                d['distance_meters'] = distance_meters
+                if distance_meters < 2.0:
+                    blocking = True
+                    d['distance'] = distance_meters
+                    d['in_safe_zone'] = True
+                    d['direction'] = self._get_direction_for_object_in_safe_zone(d['bbox'], safe_zone_coords)
+                    instruction = self._process_safe_zone_obstacles([d])
+                    if instruction:
+                        return instruction
+            if not blocking:
+                # Obstáculo presente pero fuera del corredor
+                instruction = self._process_safe_zone_clear()
+                if instruction:
+                    return instruction
+
+        if d.get('class') == 'car' or d.get('class_es') == 'auto':
+            if self._is_dangerous_object(d):
+                instruction = self._process_cars([d])
+                if instruction:
+                    return instruction
+
+        return None
+
     def _process_traffic_light(self, traffic_light: Dict) -> Optional[Dict]:
         """Procesa detección de semáforo"""
         state = traffic_light.get('state')
@@ -111,38 +532,16 @@ class NavigationLogic:
         if confidence < 0.4:
             return None
         
-        instruction = None
-        
         if state == 'red':
-            instruction = {
-                'text': '⚠️ Semáforo en rojo. Espera antes de cruzar.',
-                'priority': 10,
-                'type': 'traffic_light',
-                'action': 'stop'
-            }
+            instruction = _TL_RED.copy()
         elif state == 'yellow':
-            instruction = {
-                'text': '⚠️ Semáforo en amarillo. Ten precaución.',
-                'priority': 9,
-                'type': 'traffic_light',
-                'action': 'caution'
-            }
+            instruction = _TL_YELLOW.copy()
         elif state == 'green':
-            instruction = {
-                'text': '✅ Semáforo en verde. Puedes cruzar con precaución.',
-                'priority': 8,
-                'type': 'traffic_light',
-                'action': 'go'
-            }
+            instruction = _TL_GREEN.copy()
         else:
-            instruction = {
-                'text': '🔴 Semáforo detectado. Verifica el estado antes de cruzar.',
-                'priority': 7,
-                'type': 'traffic_light',
-                'action': 'check'
-            }
-        
-        return self._check_cooldown(instruction)
+            instruction = _TL_UNKNOWN.copy()
+
+        return instruction
     
     def _process_obstacles(self, obstacles: List[Dict]) -> Optional[Dict]:
         """Procesa detecciones de obstáculos"""
@@ -150,68 +549,57 @@ class NavigationLogic:
             return None
         
         center_x = self.frame_width / 2
+        # Umbrales laterales hoisted: son invariantes del loop y el
+        # intérprete no hace LICM por sí solo
+        left_thresh = center_x - self.frame_width * 0.15
+        right_thresh = center_x + self.frame_width * 0.15
         obstacles_left = []
         obstacles_right = []
         obstacles_center = []
-        
+
         for obs in obstacles:
             x, y, w, h = obs['bbox']
             center_obs_x = x + w / 2
-            
+
             # Calcular distancia real en metros
             object_type = obs.get('class', 'unknown')
-            distance_meters = self._calculate_distance(obs['bbox'], object_type)
+            distance_meters = self._calculate_distance(obs['bbox'], object_type,
+                                                       obs.get('class_id'))
             obs['distance_meters'] = distance_meters
-            
+
             # Solo considerar si está a menos de 2 metros
             if distance_meters < 2.0:
+                # Mutar en vez de copiar el dict por objeto
+                obs['distance'] = distance_meters
                 # Categorizar por posición
-                if center_obs_x < center_x - self.frame_width * 0.15:
-                    obstacles_left.append({**obs, 'distance': distance_meters})
-                elif center_obs_x > center_x + self.frame_width * 0.15:
-                    obstacles_right.append({**obs, 'distance': distance_meters})
+                if center_obs_x < left_thresh:
+                    obstacles_left.append(obs)
+                elif center_obs_x > right_thresh:
+                    obstacles_right.append(obs)
                 else:
-                    obstacles_center.append({**obs, 'distance': distance_meters})
+                    obstacles_center.append(obs)
         
         # Prioridad: obstáculos en el centro
         if obstacles_center:
-            closest = min(obstacles_center, key=lambda x: x['distance'])
-            return self._check_cooldown({
-                'text': f"⚠️ Obstáculo {closest.get('class_es', 'objeto')} directamente adelante. Detente o busca una ruta alternativa.",
-                'priority': 9,
-                'type': 'obstacle',
-                'action': 'stop',
-                'direction': 'center'
-            })
-        
+            closest = min(obstacles_center, key=itemgetter('distance'))
+            instruction = _OBSTACLE_CENTER.copy()
+            instruction['text'] = f"⚠️ Obstáculo {closest.get('class_es', 'objeto')} directamente adelante. Detente o busca una ruta alternativa."
+            return instruction
+
         # Obstáculos a los lados
         if obstacles_left and obstacles_right:
-            return self._check_cooldown({
-                'text': '⚠️ Obstáculos a ambos lados. Continúa con precaución.',
-                'priority': 7,
-                'type': 'obstacle',
-                'action': 'caution',
-                'direction': 'both'
-            })
+            return _OBSTACLE_BOTH.copy()
         elif obstacles_left:
-            closest = min(obstacles_left, key=lambda x: x['distance'])
-            return self._check_cooldown({
-                'text': f"Obstáculo {closest.get('class_es', 'objeto')} a la izquierda. Muévete ligeramente a la derecha.",
-                'priority': 6,
-                'type': 'obstacle',
-                'action': 'move_right',
-                'direction': 'left'
-            })
+            closest = min(obstacles_left, key=itemgetter('distance'))
+            instruction = _OBSTACLE_LEFT.copy()
+            instruction['text'] = f"Obstáculo {closest.get('class_es', 'objeto')} a la izquierda. Muévete ligeramente a la derecha."
+            return instruction
         elif obstacles_right:
-            closest = min(obstacles_right, key=lambda x: x['distance'])
-            return self._check_cooldown({
-                'text': f"Obstáculo {closest.get('class_es', 'objeto')} a la derecha. Muévete ligeramente a la izquierda.",
-                'priority': 6,
-                'type': 'obstacle',
-                'action': 'move_left',
-                'direction': 'right'
-            })
-        
+            closest = min(obstacles_right, key=itemgetter('distance'))
+            instruction = _OBSTACLE_RIGHT.copy()
+            instruction['text'] = f"Obstáculo {closest.get('class_es', 'objeto')} a la derecha. Muévete ligeramente a la izquierda."
+            return instruction
+
         return None
     
     def _process_crosswalk(self, crosswalk: Dict) -> Optional[Dict]:
@@ -220,13 +608,8 @@ class NavigationLogic:
         
         if confidence < 0.3:
             return None
-        
-        return self._check_cooldown({
-            'text': '🚶 Paso de peatones detectado. Verifica el tráfico antes de cruzar.',
-            'priority': 5,
-            'type': 'crosswalk',
-            'action': 'caution'
-        })
+
+        return _CROSSWALK.copy()
     
     def _get_dangerous_obstacles(self, obstacles: List[Dict]) -> List[Dict]:
         """
@@ -258,36 +641,29 @@ class NavigationLogic:
         
         return dangerous
     
-    def _calculate_distance(self, bbox: List[float], object_type: str = 'unknown') -> float:
+    def _calculate_distance(self, bbox: List[float], object_type: str = 'unknown',
+                            class_id: Optional[int] = None) -> float:
         """
         Calcula distancia aproximada en METROS desde la cámara al objeto
         Usa método basado en altura del objeto y posición vertical en el frame
-        
+
         Args:
             bbox: [x, y, w, h] del objeto
             object_type: Tipo de objeto para estimar tamaño real
-        
+            class_id: Id COCO de la clase si está disponible (lookup por
+                índice en vez de por string)
+
         Returns:
             Distancia en metros
         """
         x, y, w, h = bbox
-        
-        # Tamaños reales estimados en metros (altura típica)
-        real_heights = {
-            'person': 1.7,      # Altura promedio de una persona: ~170cm
-            'car': 1.5,         # Altura promedio de un auto: ~150cm
-            'truck': 2.5,       # Altura promedio de un camión: ~250cm
-            'bus': 3.0,         # Altura promedio de un autobús: ~300cm
-            'motorcycle': 1.2,   # Altura promedio de una moto: ~120cm
-            'bicycle': 1.0,     # Altura promedio de una bicicleta: ~100cm
-            'chair': 0.9,       # Altura promedio de una silla: ~90cm
-            'bench': 0.5,       # Altura promedio de un banco: ~50cm
-            'traffic light': 3.0, # Altura típica de un semáforo: ~300cm
-            'unknown': 1.0      # Tamaño por defecto: ~100cm
-        }
-        
-        # Obtener altura real estimada
-        real_height = real_heights.get(object_type.lower(), real_heights['unknown'])
+
+        # Obtener altura real estimada: por id COCO si viene del detector,
+        # por nombre de clase como fallback (API de strings compatible)
+        if class_id is not None and 0 <= class_id < len(_REAL_HEIGHTS_ARR):
+            real_height = float(_REAL_HEIGHTS_ARR[class_id])
+        else:
+            real_height = REAL_HEIGHTS.get(object_type.lower(), REAL_HEIGHTS['unknown'])
         
         # Método mejorado: usar altura del objeto y posición vertical
         # Objetos más abajo en el frame = más cerca
@@ -302,33 +678,17 @@ class NavigationLogic:
         object_area = w * h
         size_ratio = object_area / frame_area if frame_area > 0 else 0.01
         
-        # Fórmula mejorada: combinar tamaño y posición
+        # Fórmula cerrada: combinar tamaño y posición sin tablas de tramos
         # Objetos grandes y abajo = muy cerca
         # Objetos pequeños y arriba = lejos
-        
-        # Distancia base basada en tamaño
-        # Si el objeto ocupa mucho del frame, está cerca
-        if size_ratio > 0.1:  # Más del 10% del frame
-            base_distance = 1.0  # Muy cerca
-        elif size_ratio > 0.05:  # Más del 5% del frame
-            base_distance = 2.0
-        elif size_ratio > 0.02:  # Más del 2% del frame
-            base_distance = 4.0
-        elif size_ratio > 0.01:  # Más del 1% del frame
-            base_distance = 6.0
-        else:
-            base_distance = 10.0  # Lejos
-        
-        # Ajustar según posición vertical
-        # Objetos en la parte inferior (vertical_position > 0.7) están más cerca
-        if vertical_position > 0.8:
-            distance_meters = base_distance * 0.7  # Reducir distancia (más cerca)
-        elif vertical_position > 0.6:
-            distance_meters = base_distance * 0.85
-        elif vertical_position < 0.3:
-            distance_meters = base_distance * 1.5  # Aumentar distancia (más lejos)
-        else:
-            distance_meters = base_distance
+        # d = K / sqrt(size_ratio) es monótona y sigue la tabla anterior,
+        # sin las ~10 ramas por llamada y trivialmente vectorizable
+        base_distance = DISTANCE_K / math.sqrt(max(size_ratio, 1e-6))
+
+        # Factor vertical suave: abajo del frame (cerca) reduce hasta 0.7,
+        # arriba (lejos) aumenta hasta 1.5
+        vertical_factor = min(max(1.5 - 0.8 * vertical_position, 0.7), 1.5)
+        distance_meters = base_distance * vertical_factor
         
         # Ajustar según altura real del objeto
         # Si el objeto es muy alto (como un semáforo), puede estar más lejos de lo que parece
@@ -340,12 +700,59 @@ class NavigationLogic:
         
         return distance_meters
     
+    def _calculate_distances(self, bboxes: np.ndarray, object_types: List[str],
+                             class_ids: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Versión vectorizada de _calculate_distance para un batch de bboxes
+        Misma fórmula cerrada (tamaño relativo + factor vertical + bonus
+        por altura real) pero sobre arrays.
+
+        Args:
+            bboxes: Array (N, 4) con [x, y, w, h] por fila
+            object_types: Lista de clases por detección
+            class_ids: Ids COCO por detección (-1 donde no hay), para el
+                gather por índice en vez del lookup por string
+
+        Returns:
+            Array (N,) con la distancia en metros por detección
+        """
+        if bboxes.size == 0:
+            return np.zeros(0)
+
+        y = bboxes[:, 1]
+        w = bboxes[:, 2]
+        h = bboxes[:, 3]
+
+        vertical_position = (y + h) / self.frame_height if self.frame_height > 0 else np.full(len(bboxes), 0.5)
+        frame_area = self.frame_width * self.frame_height
+        size_ratio = (w * h) / frame_area if frame_area > 0 else np.full(len(bboxes), 0.01)
+
+        # Misma fórmula cerrada que la ruta escalar, sobre arrays
+        base_distance = DISTANCE_K / np.sqrt(np.maximum(size_ratio, 1e-6))
+        vertical_factor = np.clip(1.5 - 0.8 * vertical_position, 0.7, 1.5)
+
+        if class_ids is not None:
+            ids = np.asarray(class_ids, dtype=np.intp)
+            valid = (ids >= 0) & (ids < len(_REAL_HEIGHTS_ARR))
+            real_heights = np.where(
+                valid, _REAL_HEIGHTS_ARR[np.where(valid, ids, 0)], 1.0)
+        else:
+            real_heights = np.fromiter(
+                (REAL_HEIGHTS.get(t.lower(), 1.0) for t in object_types),
+                dtype=np.float64, count=len(object_types))
+
+        distances = base_distance * vertical_factor
+        distances = np.where(real_heights > 2.0, distances * 1.3, distances)
+        return np.clip(distances, 0.5, 30.0)
+
     def _check_cooldown(self, instruction: Dict) -> Optional[Dict]:
         """Verifica cooldown para evitar instrucciones repetitivas"""
-        import time
-        
-        now = time.time() * 1000  # milisegundos
-        key = f"{instruction['type']}_{instruction['action']}"
+        # Reloj monotónico en ms enteros: inmune a saltos de NTP y sin
+        # multiplicación float por llamada
+        now = time.monotonic_ns() // 1_000_000
+        # Clave como tupla: hashear dos strings ya internados es más
+        # barato que formatear y hashear un string nuevo por llamada
+        key = (instruction['type'], instruction['action'])
         
         if key in self.last_instruction_time:
             time_since = now - self.last_instruction_time[key]
@@ -367,6 +774,12 @@ class NavigationLogic:
         Returns:
             Dict con coordenadas del trapecio (bottom_left, bottom_right, top_left, top_right)
         """
+        # La zona solo depende de las dimensiones del frame: reutilizar
+        # el dict cacheado mientras no cambien
+        cache_key = (self.frame_width, self.frame_height)
+        if cache_key == self._safe_zone_cache_key:
+            return self._safe_zone_cache
+
         # Centro FIJO: siempre en el centro del frame
         center_x = self.frame_width / 2
         
@@ -384,7 +797,7 @@ class NavigationLogic:
         top_left_x = center_x - (top_width / 2)
         top_right_x = center_x + (top_width / 2)
         
-        return {
+        safe_zone = {
             'bottom_left': [float(bottom_left_x), float(bottom_y)],
             'bottom_right': [float(bottom_right_x), float(bottom_y)],
             'top_left': [float(top_left_x), float(top_y)],
@@ -398,80 +811,101 @@ class NavigationLogic:
             'path_adjusted': False,  # Siempre False (zona fija)
             'path_confidence': 0.0  # Siempre 0 (zona fija)
         }
-    
-    def _is_object_in_safe_zone(self, bbox: List[float]) -> bool:
+
+        self._safe_zone_cache = safe_zone
+        self._safe_zone_cache_key = cache_key
+        # Escalares del trapecio como atributos para la geometría interna
+        self._zone_top_y = safe_zone['top_y']
+        self._zone_bottom_y = safe_zone['bottom_y']
+        self._zone_top_width = safe_zone['top_width']
+        self._zone_bottom_width = safe_zone['bottom_width']
+        self._zone_center_x = safe_zone['center_x']
+        return safe_zone
+
+    def _is_object_in_safe_zone(self, bbox: List[float], safe_zone: Optional[Dict] = None) -> bool:
         """
         Verifica si un objeto está dentro de la zona segura (trapecio con perspectiva)
-        
+
         Args:
             bbox: [x, y, width, height] del objeto
-        
+            safe_zone: Zona segura ya calculada (se obtiene del cache si falta)
+
         Returns:
             True si el objeto está dentro de la zona segura
         """
-        safe_zone = self.get_safe_zone_coordinates()
-        
+        if safe_zone is None:
+            self.get_safe_zone_coordinates()  # refresca los _zone_* si hace falta
+
+        # Wrapper delgado: la aritmética vive en _in_trapezoid con la zona
+        # desempaquetada en escalares (compilable con numba). Se leen los
+        # atributos _zone_* en vez de indexar el dict por clave
         obj_x, obj_y, obj_w, obj_h = bbox
-        obj_center_x = obj_x + obj_w / 2
-        obj_center_y = obj_y + obj_h / 2
-        
-        # Verificar si el centro del objeto está dentro del trapecio
-        # Usar punto en polígono para trapecio
-        if not (safe_zone['top_y'] <= obj_center_y <= safe_zone['bottom_y']):
-            return False
-        
-        # Calcular el ancho del trapecio a la altura del objeto (interpolación lineal)
-        # El trapecio va de top_width (arriba) a bottom_width (abajo)
-        y_ratio = (obj_center_y - safe_zone['top_y']) / (safe_zone['bottom_y'] - safe_zone['top_y'])
-        width_at_y = safe_zone['top_width'] + (safe_zone['bottom_width'] - safe_zone['top_width']) * y_ratio
-        
-        # Verificar si el centro X está dentro del ancho del trapecio a esa altura
-        left_bound = safe_zone['center_x'] - (width_at_y / 2)
-        right_bound = safe_zone['center_x'] + (width_at_y / 2)
-        
-        center_in_zone = left_bound <= obj_center_x <= right_bound
-        
-        # También verificar si hay superposición significativa
-        # Calcular área de superposición aproximada
-        obj_bottom = obj_y + obj_h
-        obj_top = obj_y
-        
-        # Verificar si alguna parte del objeto está en la zona
-        if obj_bottom < safe_zone['top_y'] or obj_top > safe_zone['bottom_y']:
-            return False
-        
-        # Calcular límites del trapecio en la parte superior e inferior del objeto
-        obj_top_ratio = max(0, min(1, (obj_top - safe_zone['top_y']) / (safe_zone['bottom_y'] - safe_zone['top_y'])))
-        obj_bottom_ratio = max(0, min(1, (obj_bottom - safe_zone['top_y']) / (safe_zone['bottom_y'] - safe_zone['top_y'])))
-        
-        width_at_obj_top = safe_zone['top_width'] + (safe_zone['bottom_width'] - safe_zone['top_width']) * obj_top_ratio
-        width_at_obj_bottom = safe_zone['top_width'] + (safe_zone['bottom_width'] - safe_zone['top_width']) * obj_bottom_ratio
-        
-        left_at_obj_top = safe_zone['center_x'] - (width_at_obj_top / 2)
-        right_at_obj_top = safe_zone['center_x'] + (width_at_obj_top / 2)
-        left_at_obj_bottom = safe_zone['center_x'] - (width_at_obj_bottom / 2)
-        right_at_obj_bottom = safe_zone['center_x'] + (width_at_obj_bottom / 2)
-        
-        # Verificar superposición horizontal
-        obj_left = obj_x
-        obj_right = obj_x + obj_w
-        
-        overlap_left = max(left_at_obj_top, left_at_obj_bottom, obj_left)
-        overlap_right = min(right_at_obj_top, right_at_obj_bottom, obj_right)
-        
-        if overlap_left < overlap_right:
-            overlap_width = overlap_right - overlap_left
-            overlap_height = min(obj_bottom, safe_zone['bottom_y']) - max(obj_top, safe_zone['top_y'])
-            overlap_area = overlap_width * overlap_height
-            obj_area = obj_w * obj_h
-            
-            # Si hay superposición significativa (>25% del objeto)
-            significant_overlap = overlap_area > obj_area * 0.25
-            return center_in_zone or significant_overlap
-        
-        return center_in_zone
+        return bool(_in_trapezoid(
+            float(obj_x), float(obj_y), float(obj_w), float(obj_h),
+            self._zone_top_y, self._zone_bottom_y,
+            self._zone_top_width, self._zone_bottom_width,
+            self._zone_center_x))
     
-    def _get_direction_for_object_in_safe_zone(self, bbox: List[float]) -> int:
+    def objects_in_safe_zone_mask(self, bboxes: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de _is_object_in_safe_zone para un batch de bboxes
+
+        Hace el mismo test de trapecio (centro dentro + superposición
+        significativa >25%) con broadcasts de numpy en vez de un loop
+        de Python por detección.
+
+        Args:
+            bboxes: Array (N, 4) con [x, y, width, height] por fila
+
+        Returns:
+            Array booleano (N,) con True donde el objeto está en la zona segura
+        """
+        if bboxes.size == 0:
+            return np.zeros(0, dtype=bool)
+
+        self.get_safe_zone_coordinates()  # refresca los _zone_* si hace falta
+        top_y = self._zone_top_y
+        bottom_y = self._zone_bottom_y
+        top_width = self._zone_top_width
+        bottom_width = self._zone_bottom_width
+        center_x = self._zone_center_x
+        zone_height = bottom_y - top_y
+
+        x = bboxes[:, 0]
+        y = bboxes[:, 1]
+        w = bboxes[:, 2]
+        h = bboxes[:, 3]
+        obj_center_x = x + w / 2
+        obj_center_y = y + h / 2
+        obj_bottom = y + h
+
+        # Centro vertical dentro del trapecio (mismo early-return que el escalar)
+        center_y_in_zone = (top_y <= obj_center_y) & (obj_center_y <= bottom_y)
+
+        # Ancho del trapecio a la altura del centro (interpolación lineal)
+        y_ratio = np.clip((obj_center_y - top_y) / zone_height, 0.0, 1.0)
+        width_at_y = top_width + (bottom_width - top_width) * y_ratio
+        center_in_zone = center_y_in_zone & (np.abs(obj_center_x - center_x) <= width_at_y / 2)
+
+        # Superposición significativa: ancho del trapecio en el tope y la base
+        # del objeto; el overlap usa la mitad más estrecha de las dos
+        top_ratio = np.clip((y - top_y) / zone_height, 0.0, 1.0)
+        bottom_ratio = np.clip((obj_bottom - top_y) / zone_height, 0.0, 1.0)
+        width_at_obj_top = top_width + (bottom_width - top_width) * top_ratio
+        width_at_obj_bottom = top_width + (bottom_width - top_width) * bottom_ratio
+        narrow_half = np.minimum(width_at_obj_top, width_at_obj_bottom) / 2
+
+        overlap_left = np.maximum(center_x - narrow_half, x)
+        overlap_right = np.minimum(center_x + narrow_half, x + w)
+        has_overlap = overlap_left < overlap_right
+
+        overlap_width = overlap_right - overlap_left
+        overlap_height = np.minimum(obj_bottom, bottom_y) - np.maximum(y, top_y)
+        significant_overlap = has_overlap & (overlap_width * overlap_height > w * h * 0.25)
+
+        return center_y_in_zone & (center_in_zone | significant_overlap)
+
+    def _get_direction_for_object_in_safe_zone(self, bbox: List[float], safe_zone: Optional[Dict] = None) -> int:
         """
         Calcula la dirección de movimiento necesaria para evitar un objeto en la zona segura
         
@@ -482,55 +916,78 @@ class NavigationLogic:
             0 si debe moverse a la izquierda (objeto a la derecha)
             1 si debe moverse a la derecha (objeto a la izquierda)
         """
-        safe_zone = self.get_safe_zone_coordinates()
+        if safe_zone is None:
+            self.get_safe_zone_coordinates()  # refresca los _zone_* si hace falta
         obj_x, obj_y, obj_w, obj_h = bbox
         obj_center_x = obj_x + obj_w / 2
-        
+
         # Comparar con el centro de la zona segura
-        safe_zone_center_x = safe_zone['center_x']
+        safe_zone_center_x = self._zone_center_x
         
         # Si el objeto está a la izquierda del centro de la zona segura
-        # → moverse a la derecha (1) para dejarlo a la izquierda
-        if obj_center_x < safe_zone_center_x:
-            return 1  # Moverse a la derecha
-        else:
-            return 0  # Moverse a la izquierda
+        # → moverse a la derecha (1); la comparación ya es el resultado
+        return int(obj_center_x < safe_zone_center_x)
     
-    def _get_obstacles_in_safe_zone(self, obstacles: List[Dict]) -> List[Dict]:
+    def _split_obstacles_by_safe_zone(self, obstacles: List[Dict], safe_zone: Optional[Dict] = None):
         """
-        Filtra obstáculos que están dentro de la zona segura
-        
+        Una sola pasada sobre los obstáculos: el test de trapecio, la
+        distancia y la dirección se calculan una vez por objeto y se
+        retornan ambos resultados, en vez de recorrer la lista dos veces
+        (filtrado + zona segura) repitiendo el test por objeto.
+
         Args:
             obstacles: Lista de detecciones de obstáculos
-        
+            safe_zone: Zona segura ya calculada (se obtiene del cache si falta)
+
         Returns:
-            Lista de obstáculos dentro de la zona segura
+            Tupla (filtrados con excepción de autos, en zona ordenados
+            por distancia)
         """
+        if safe_zone is None:
+            safe_zone = self.get_safe_zone_coordinates()
+        filtered = []
         safe_zone_obstacles = []
-        
+
         for obs in obstacles:
-            if self._is_object_in_safe_zone(obs['bbox']):
+            in_zone = self._is_object_in_safe_zone(obs['bbox'], safe_zone)
+
+            # Autos siempre se incluyen (sin importar posición)
+            if in_zone or obs.get('class') == 'car' or obs.get('class_es') == 'auto':
+                filtered.append(obs)
+
+            if in_zone:
                 # Calcular distancia real en metros
                 object_type = obs.get('class', 'unknown')
-                distance_meters = self._calculate_distance(obs['bbox'], object_type)
+                distance_meters = self._calculate_distance(obs['bbox'], object_type,
+                                                           obs.get('class_id'))
                 obs['distance_meters'] = distance_meters
-                
-                # Calcular dirección de movimiento (0 = izquierda, 1 = derecha)
-                direction = self._get_direction_for_object_in_safe_zone(obs['bbox'])
-                
+
                 # Solo considerar si está a menos de 2 metros
                 if distance_meters < 2.0:
-                    safe_zone_obstacles.append({
-                        **obs, 
-                        'distance': distance_meters, 
-                        'in_safe_zone': True,
-                        'direction': direction
-                    })
-        
+                    # Dirección de movimiento (0 = izquierda, 1 = derecha)
+                    # Mutar en vez de copiar el dict completo
+                    obs['distance'] = distance_meters
+                    obs['in_safe_zone'] = True
+                    obs['direction'] = self._get_direction_for_object_in_safe_zone(obs['bbox'], safe_zone)
+                    safe_zone_obstacles.append(obs)
+
         # Ordenar por distancia (más cercanos primero)
-        safe_zone_obstacles.sort(key=lambda x: x.get('distance', 1000))
-        
-        return safe_zone_obstacles
+        safe_zone_obstacles.sort(key=itemgetter('distance'))
+
+        return filtered, safe_zone_obstacles
+
+    def _get_obstacles_in_safe_zone(self, obstacles: List[Dict], safe_zone: Optional[Dict] = None) -> List[Dict]:
+        """
+        Filtra obstáculos que están dentro de la zona segura
+
+        Args:
+            obstacles: Lista de detecciones de obstáculos
+            safe_zone: Zona segura ya calculada (se obtiene del cache si falta)
+
+        Returns:
+            Lista de obstáculos dentro de la zona segura
+        """
+        return self._split_obstacles_by_safe_zone(obstacles, safe_zone)[1]
     
     def _process_safe_zone_obstacles(self, obstacles: List[Dict]) -> Optional[Dict]:
         """
@@ -554,25 +1011,14 @@ class NavigationLogic:
         obj_center_x = x + w / 2
         frame_center_x = self.frame_width / 2
         
-        # Si el obstáculo está más a la izquierda del centro, desviar a la derecha
-        if obj_center_x < frame_center_x:
-            return self._check_cooldown({
-                'text': f"⚠️ {obj_type.capitalize()} bloqueando tu camino. Muévete a la derecha.",
-                'priority': 9,
-                'type': 'safe_zone',
-                'action': 'move_right',
-                'direction': 'right',
-                'obstacle_count': len(obstacles)
-            })
-        else:
-            return self._check_cooldown({
-                'text': f"⚠️ {obj_type.capitalize()} bloqueando tu camino. Muévete a la izquierda.",
-                'priority': 9,
-                'type': 'safe_zone',
-                'action': 'move_left',
-                'direction': 'left',
-                'obstacle_count': len(obstacles)
-            })
+        # Si el obstáculo está más a la izquierda del centro, desviar a la
+        # derecha: la comparación produce el índice directamente, sin rama
+        direction = int(obj_center_x < frame_center_x)
+        instruction = _SAFE_ZONE_BLOCKED[direction].copy()
+        instruction['text'] = (f"⚠️ {obj_type.capitalize()} bloqueando tu camino. "
+                               f"Muévete a la {_SAFE_ZONE_MOVE_WORD[direction]}.")
+        instruction['obstacle_count'] = len(obstacles)
+        return instruction
     
     def _process_safe_zone_clear(self) -> Optional[Dict]:
         """
@@ -581,36 +1027,21 @@ class NavigationLogic:
         Returns:
             Instrucción de avanzar
         """
-        return self._check_cooldown({
-            'text': '✅ Zona segura libre. Sigue recto.',
-            'priority': 3,
-            'type': 'safe_zone',
-            'action': 'go_forward',
-            'direction': 'forward'
-        })
+        return _SAFE_ZONE_CLEAR.copy()
     
-    def _filter_objects_by_safe_zone(self, obstacles: List[Dict]) -> List[Dict]:
+    def _filter_objects_by_safe_zone(self, obstacles: List[Dict], safe_zone: Optional[Dict] = None) -> List[Dict]:
         """
         Filtra objetos: solo incluye los que están dentro de la zona segura
         EXCEPCIÓN: Autos siempre se incluyen (pueden estar fuera)
-        
+
         Args:
             obstacles: Lista de detecciones de obstáculos
-        
+            safe_zone: Zona segura ya calculada (se obtiene del cache si falta)
+
         Returns:
             Lista filtrada de obstáculos
         """
-        filtered = []
-        
-        for obs in obstacles:
-            # Autos siempre se incluyen (sin importar posición)
-            if obs.get('class') == 'car' or obs.get('class_es') == 'auto':
-                filtered.append(obs)
-            # Otros objetos solo si están en zona segura
-            elif self._is_object_in_safe_zone(obs['bbox']):
-                filtered.append(obs)
-        
-        return filtered
+        return self._split_obstacles_by_safe_zone(obstacles, safe_zone)[0]
     
     def _is_dangerous_object(self, obj: Dict) -> bool:
         """
@@ -654,30 +1085,31 @@ class NavigationLogic:
         if not cars:
             return None
         
-        # Calcular distancia para cada auto
-        dangerous_cars = []
+        # Calcular distancia para cada auto, rastreando el más cercano en
+        # la misma pasada (sin un min() con lambda posterior). Si el batch
+        # vectorizado ya anotó distance_meters, se reutiliza
+        closest_distance = math.inf
         for car in cars:
-            distance_meters = self._calculate_distance(car['bbox'], 'car')
-            car['distance_meters'] = distance_meters
-            
+            distance_meters = car.get('distance_meters')
+            if distance_meters is None:
+                distance_meters = self._calculate_distance(car['bbox'], 'car',
+                                                           car.get('class_id'))
+                car['distance_meters'] = distance_meters
+
             # Solo es peligroso si está a menos de 2 metros
-            if distance_meters < 2.0:
-                dangerous_cars.append(car)
-        
-        if dangerous_cars:
-            closest = min(dangerous_cars, key=lambda x: x.get('distance_meters', 10.0))
-            distance = closest.get('distance_meters', 0)
-            return self._check_cooldown({
-                'text': f"⚠️ Auto detectado a {distance:.1f}m. Ten precaución.",
-                'priority': 8,
-                'type': 'obstacle',
-                'action': 'caution',
-                'direction': 'center'
-            })
-        
+            if distance_meters < 2.0 and distance_meters < closest_distance:
+                closest_distance = distance_meters
+
+        if closest_distance < math.inf:
+            instruction = _CAR_WARNING.copy()
+            instruction['text'] = f"⚠️ Auto detectado a {closest_distance:.1f}m. Ten precaución."
+            return instruction
+
         return None
     
     def reset(self):
         """Resetea el estado de la lógica"""
         self.last_instruction_time = {}
+        self._last_signature = None
+        self._last_instruction = None
 
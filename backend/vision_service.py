@@ -26,6 +26,14 @@ except ImportError:
     ELEVENLABS_AVAILABLE = False
     logging.warning("elevenlabs no disponible. Instala con: pip install elevenlabs")
 
+try:
+    # Encode JPEG vía libjpeg-turbo (DCT/Huffman con SIMD, 2-4x más
+    # rápido que el libjpeg de OpenCV)
+    from turbojpeg import TurboJPEG, TJSAMP_420
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError):
+    TURBOJPEG_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
@@ -54,26 +62,63 @@ def initialize_clients():
         except Exception as e:
             logger.error(f"❌ Error al inicializar ElevenLabs: {str(e)}")
 
-def analyze_image_with_claude(frame: cv2.Mat, question: str = "¿qué es esto?") -> Optional[str]:
+# Calidad 75 + JPEG: suficiente para una respuesta de 15 palabras y
+# ~40% menos bytes hacia la API que la calidad por defecto (95)
+_JPEG_QUALITY = 75
+_JPEG_ENCODE_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), _JPEG_QUALITY]
+
+# Encoder turbo lazy (TurboJPEG() carga la librería nativa)
+_turbojpeg_encoder = None
+
+def _get_turbojpeg():
+    """Instancia (una sola vez) el encoder de libjpeg-turbo"""
+    global _turbojpeg_encoder
+    if _turbojpeg_encoder is None:
+        _turbojpeg_encoder = TurboJPEG()
+    return _turbojpeg_encoder
+
+def encode_frame_base64(frame: cv2.Mat) -> str:
+    """
+    Codifica un frame BGR a JPEG base64 para las APIs de visión
+
+    Args:
+        frame: Frame de OpenCV (BGR)
+
+    Returns:
+        String base64 del JPEG
+    """
+    if TURBOJPEG_AVAILABLE:
+        # Subsampling 4:2:0: menos bytes de croma sin impacto visible
+        # para el análisis
+        buffer = _get_turbojpeg().encode(frame, quality=_JPEG_QUALITY,
+                                         jpeg_subsample=TJSAMP_420)
+    else:
+        _, buffer = cv2.imencode(".jpg", frame, _JPEG_ENCODE_PARAMS)
+    return base64.b64encode(buffer).decode("utf-8")
+
+def analyze_image_with_claude(frame: cv2.Mat, question: str = "¿qué es esto?",
+                              imagen_base64: Optional[str] = None) -> Optional[str]:
     """
     Analiza una imagen usando Claude Vision API
-    
+
     Args:
         frame: Frame de OpenCV (BGR)
         question: Pregunta del usuario sobre la imagen
-    
+        imagen_base64: JPEG ya codificado (evita re-codificar si el
+            caller ya lo tiene, p. ej. en reintentos)
+
     Returns:
         Respuesta de Claude en texto, o None si hay error
     """
     if not ANTHROPIC_AVAILABLE or not claude_client:
         logger.error("Claude no está disponible. Verifica ANTHROPIC_API_KEY")
         return None
-    
+
     try:
-        # Convertir frame a base64
-        _, buffer = cv2.imencode(".jpg", frame)
-        imagen_base64 = base64.b64encode(buffer).decode("utf-8")
-        
+        # Convertir frame a base64 (solo si no vino pre-codificado)
+        if imagen_base64 is None:
+            imagen_base64 = encode_frame_base64(frame)
+
         # Crear prompt
         prompt = f"""
 Eres un asistente visual para personas con discapacidad visual. 
@@ -111,41 +156,59 @@ Pregunta del usuario: {question}
         logger.error(f"❌ Error al analizar imagen con Claude: {str(e)}")
         return None
 
-def generate_audio_with_elevenlabs(text: str, voice_id: Optional[str] = None) -> Optional[bytes]:
+def stream_audio_with_elevenlabs(text: str, voice_id: Optional[str] = None):
     """
-    Genera audio usando ElevenLabs TTS
-    
+    Genera audio usando ElevenLabs TTS, entregando los chunks MP3 a
+    medida que llegan (el primer audio sale con el primer chunk, sin
+    esperar la síntesis completa)
+
     Args:
         text: Texto a convertir a voz
         voice_id: ID de voz (opcional, usa el de .env por defecto)
-    
-    Returns:
-        Bytes del audio MP3, o None si hay error
+
+    Yields:
+        Chunks de bytes del audio MP3
     """
     if not ELEVENLABS_AVAILABLE or not tts_client:
         logger.error("ElevenLabs no está disponible. Verifica ELEVENLABS_API_KEY")
-        return None
-    
+        return
+
     try:
         voice = voice_id or ELEVENLABS_VOICE_ID
-        
-        # Generar audio
+
         audio_stream = tts_client.text_to_speech.convert(
             voice_id=voice,
             text=text,
             model_id="eleven_multilingual_v2",
             output_format="mp3_44100_128",
         )
-        
-        # Combinar chunks en bytes
-        audio_bytes = b"".join(audio_stream)
-        logger.info(f"✅ Audio generado: {len(audio_bytes)} bytes")
-        return audio_bytes
-        
+
+        for chunk in audio_stream:
+            if chunk:
+                yield chunk
+
     except Exception as e:
         logger.error(f"❌ Error al generar audio con ElevenLabs: {str(e)}")
+
+def generate_audio_with_elevenlabs(text: str, voice_id: Optional[str] = None) -> Optional[bytes]:
+    """
+    Genera audio usando ElevenLabs TTS (versión buffered completa)
+
+    Args:
+        text: Texto a convertir a voz
+        voice_id: ID de voz (opcional, usa el de .env por defecto)
+
+    Returns:
+        Bytes del audio MP3, o None si hay error
+    """
+    audio_bytes = b"".join(stream_audio_with_elevenlabs(text, voice_id))
+
+    if not audio_bytes:
         return None
 
+    logger.info(f"✅ Audio generado: {len(audio_bytes)} bytes")
+    return audio_bytes
+
 def analyze_and_speak(frame: cv2.Mat, question: str = "¿qué es esto?") -> dict:
     """
     Analiza imagen y genera audio completo
@@ -161,8 +224,12 @@ def analyze_and_speak(frame: cv2.Mat, question: str = "¿qué es esto?") -> dict
             - audio_base64: str (audio en base64)
             - error: str (si hay error)
     """
+    # Codificar una sola vez y pasar el base64 listo (un solo pase de
+    # libjpeg aunque el análisis se reintente)
+    imagen_base64 = encode_frame_base64(frame)
+
     # Analizar imagen
-    text_response = analyze_image_with_claude(frame, question)
+    text_response = analyze_image_with_claude(frame, question, imagen_base64)
     
     if not text_response:
         return {
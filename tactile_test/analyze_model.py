@@ -113,18 +113,18 @@ if test_image:
             
             if result.boxes is not None and len(result.boxes) > 0:
                 print(f"   ✅ Se detectaron {len(result.boxes)} objetos:")
-                classes_detected = {}
-                for box in result.boxes:
-                    cls = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    if cls not in classes_detected:
-                        classes_detected[cls] = []
-                    classes_detected[cls].append(conf)
-                
-                for cls, confs in classes_detected.items():
-                    class_name = model.names.get(cls, f"Clase {cls}") if hasattr(model, 'names') else f"Clase {cls}"
-                    avg_conf = sum(confs) / len(confs)
-                    print(f"      - {class_name} (clase {cls}): {len(confs)} detecciones, confianza promedio: {avg_conf:.2f}")
+                # Una sola bajada a numpy y agregación vectorizada por
+                # clase, en vez de iterar caja por caja con .cpu() cada una
+                arr = result.boxes.data.cpu().numpy()  # [x1,y1,x2,y2,conf,cls]
+                cls_ids = arr[:, 5].astype(int)
+                confs = arr[:, 4]
+                uniq, inv, counts = np.unique(cls_ids, return_inverse=True,
+                                              return_counts=True)
+                avg_confs = np.bincount(inv, weights=confs) / counts
+
+                for cls, count, avg_conf in zip(uniq, counts, avg_confs):
+                    class_name = model.names.get(int(cls), f"Clase {cls}") if hasattr(model, 'names') else f"Clase {cls}"
+                    print(f"      - {class_name} (clase {cls}): {count} detecciones, confianza promedio: {avg_conf:.2f}")
             else:
                 print("   ⚠️ No se detectaron objetos en la imagen de prueba")
     except Exception as e: